@@ -0,0 +1,88 @@
+import argparse
+import ast
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Cold-start import cost of the entry point and of each page, measured in
+# fresh interpreters the way an autoscaled replica pays it. Each script's
+# top-level imports are replayed on their own, without running Streamlit.
+#
+#   python benchmarks/bench_cold_start.py --repeat 7 --importtime
+
+SCRIPTS = ('streamlit_app.py', 'rtc_simulation.py', 'rtc_simulation_area.py', 'rtc_simulation_volume.py',
+           'rtc_simulation_lines.py', 'rtc_simulation_lines2.py', 'rtc_simulation_lines3.py')
+# What every entry script imported before the multipage app
+LEGACY_IMPORTS = 'import streamlit, numpy, plotly.graph_objects, pandas, matplotlib'
+HEAVY_MODULES = ('pandas', 'matplotlib', 'pyarrow')
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(elapsed, ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def script_imports(path):
+    # The script's top-level import statements as source
+    with open(path) as f:
+        tree = ast.parse(f.read())
+    return '\n'.join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def measure(imports, repeat):
+    # (median seconds, heavy modules loaded) over fresh interpreters
+    times, heavy = [], ''
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(imports=imports, heavy=HEAVY_MODULES)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(out[0]))
+        heavy = out[1] if len(out) > 1 else ''
+    return statistics.median(times), heavy
+
+
+def _importtime(source):
+    # [(cumulative microseconds, module)] of the top-level imports in `source`
+    err = subprocess.run([sys.executable, '-X', 'importtime', '-c', source], cwd=ROOT,
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if line.startswith('import time:') and 'cumulative' not in line:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if not name.startswith('   '):
+                rows.append((int(cumulative), name.strip()))
+    return rows
+
+
+def slowest_imports(imports, top):
+    # Modules with the largest cumulative import time, leaving out what the
+    # interpreter itself loads at startup
+    startup = {name for _, name in _importtime('pass')}
+    return sorted(row for row in _importtime(imports) if row[1] not in startup)[::-1][:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import time of the RTC entry point and pages")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per script (median reported)")
+    parser.add_argument('--importtime', action='store_true', help="also list the slowest top-level imports")
+    parser.add_argument('--top', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    targets = [('legacy imports', LEGACY_IMPORTS)]
+    targets += [(script, script_imports(os.path.join(ROOT, script))) for script in SCRIPTS]
+    print(f"{'script':<26} {'imports ms':>10}  heavy modules loaded")
+    for label, imports in targets:
+        seconds, heavy = measure(imports, args.repeat)
+        print(f"{label:<26} {seconds * 1000:>10.0f}  {heavy or '-'}")
+        if args.importtime:
+            for us, name in slowest_imports(imports, args.top):
+                print(f"{'':<4}{name:<22} {us / 1000:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from rtc_engine import compute_fields
+from rtc_tiles import TILE_BYTES, tiled_fields
+
+# Thread scaling of the tiled resonance chain (rtc_tiles) from 1 to N
+# workers at large grids, against the untiled broadcast evaluation. Speedup
+# and parallel efficiency are relative to one tiled worker.
+#
+#   python benchmarks/bench_tiles.py --grid 1000 2000 4000 --workers 1 2 4 8
+
+PARAMS = (1.0, 2.0, 1.5, 3.0, 0.8, 2.5, 1.8, 2.7, np.pi / 4)
+
+
+def worker_counts():
+    # 1, 2, 4, ... up to and including every core
+    cores = os.cpu_count() or 1
+    counts = [1 << i for i in range(cores.bit_length()) if 1 << i < cores]
+    return counts + [cores]
+
+
+def best_time(repeat, fn):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Thread scaling of the tiled field computation")
+    parser.add_argument('--grid', type=int, nargs='+', default=[1000, 2000, 4000], help="grid points per axis")
+    parser.add_argument('--workers', type=int, nargs='+', default=worker_counts())
+    parser.add_argument('--frames', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tile-bytes', type=int, default=TILE_BYTES)
+    parser.add_argument('--no-baseline', action='store_true',
+                        help="skip the untiled evaluation (it needs several times the output's memory)")
+    args = parser.parse_args(argv)
+
+    print(f"{os.cpu_count()} cores, {args.frames} frames, tiles of {args.tile_bytes // 1024} KiB")
+    print(f"{'grid':>6} {'workers':>8} {'ms':>9} {'Mpts/s':>8} {'speedup':>8} {'efficiency':>10}")
+    for grid in args.grid:
+        x = np.linspace(-np.pi, np.pi, grid)
+        X, Y = np.meshgrid(x, x)
+        T_seq = np.linspace(0, 2 * np.pi, args.frames)
+        points = grid * grid * args.frames
+        if not args.no_baseline:
+            seconds = best_time(args.repeat, lambda: compute_fields(X, Y, T_seq, *PARAMS))
+            print(f"{grid:>6} {'untiled':>8} {seconds * 1000:>9.0f} {points / seconds / 1e6:>8.1f}")
+        single = None
+        for workers in args.workers:
+            seconds = best_time(args.repeat, lambda: tiled_fields(X, Y, T_seq, *PARAMS, workers=workers,
+                                                                  tile_bytes=args.tile_bytes))
+            single = single or seconds
+            print(f"{grid:>6} {workers:>8} {seconds * 1000:>9.0f} {points / seconds / 1e6:>8.1f} "
+                  f"{single / seconds:>8.2f} {single / seconds / workers:>10.0%}")
+
+
+if __name__ == '__main__':
+    main()
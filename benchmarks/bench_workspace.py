@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from rtc_engine import Workspace
+
+# Peak transient memory and throughput of one field frame: the per-frame
+# expression the apps used to evaluate against the preallocated Workspace
+# in float64 and float32.
+#
+#   python benchmarks/bench_workspace.py --grid 500 1000 2000
+
+PARAMS = (1.0, 2.0, 1.5, 3.0, 0.8, 2.5, 1.8, 2.7, np.pi / 4)
+
+
+def expression_frame(X, Y, t, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi):
+    # The field as create_figure/compute_wave wrote it, one temporary per operation
+    psi_i = A_i * np.sin(k_i * X + l_i * Y - omega_i * t)
+    psi_e = A_e * np.sin(k_e * X + l_e * Y - omega_e * t + phi)
+    psi_r = psi_i + psi_e + psi_i * psi_e
+    E_exp = psi_r ** 2
+    dpsi_r_dt = (-A_i * omega_i * np.cos(k_i * X + l_i * Y - omega_i * t)
+                 - A_e * omega_e * np.cos(k_e * X + l_e * Y - omega_e * t + phi)
+                 - (A_i * omega_i * np.cos(k_i * X + l_i * Y - omega_i * t) * psi_e +
+                    A_e * omega_e * np.cos(k_e * X + l_e * Y - omega_e * t + phi) * psi_i))
+    E_per = np.abs(dpsi_r_dt)
+    return E_exp, E_per
+
+
+def measure(frame, times):
+    # (frames per second, peak bytes allocated while evaluating one frame)
+    frame(times[0])
+    tracemalloc.start()
+    frame(times[1])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for t in times:
+        frame(t)
+    return len(times) / (time.perf_counter() - start), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-frame memory and throughput of the field evaluation paths")
+    parser.add_argument('--grid', type=int, nargs='+', default=[500, 1000, 2000])
+    parser.add_argument('--frames', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    times = np.linspace(0, 2 * np.pi, max(args.frames, 2))
+    print(f"{'grid':>6} {'mode':<18} {'frames/s':>9} {'peak MiB/frame':>15} {'workspace MiB':>14}")
+    for n in args.grid:
+        x = np.linspace(-np.pi, np.pi, n)
+        X, Y = np.meshgrid(x, x)
+        rate, peak = measure(lambda t: expression_frame(X, Y, t, *PARAMS), times)
+        print(f"{n:>5}² {'expression f64':<18} {rate:>9.2f} {peak / 2**20:>15.1f} {'-':>14}")
+        for dtype in (np.float64, np.float32):
+            ws = Workspace(X, Y, *PARAMS, dtype=dtype)
+            rate, peak = measure(ws.evaluate, times)
+            label = f"workspace {np.dtype(dtype).name.replace('float', 'f')}"
+            print(f"{n:>5}² {label:<18} {rate:>9.2f} {peak / 2**20:>15.1f} {ws.nbytes / 2**20:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+# Offline load test: N simulated viewers of one app in this process, each an
+# AppTest session replaying a scripted pattern of slider drags, toggles and
+# playback ticks, the way N browser tabs drive one Streamlit server (and its
+# shared caches). Reported per N: script-run latency percentiles,
+# throughput, peak RSS, CPU seconds per session, and for playback the tick
+# rate kept up against the target FPS. With --max-p90-ms/--min-fps the exit
+# status gates a deployment.
+#
+#   python benchmarks/load_test.py --app tubes lines3 --sessions 1 2 4 8
+#   python benchmarks/load_test.py --app lines3 --sessions 4 --max-p90-ms 250 --json load.json
+#
+# AppTest cannot fire st.fragment(run_every) timers, so a playback tick is a
+# full rerun paced at the app's FPS: an upper bound on the fragment rerun.
+
+# One session's script: (action, widget label, value). 'tick' reruns after
+# 1/fps since the previous run started; every other action reruns at once.
+PHI = "Phase shift φ (radians)"
+SCENARIOS = dict(
+    tubes=('rtc_simulation.py', 10, (
+        [('slider', PHI, round(v, 2)) for v in np.linspace(0.2, 1.4, 6)]
+        + [('slider', "A_e (Amplitude extrinsic)", v) for v in (0.6, 0.9, 1.2)]
+        + [('checkbox', "Animate Wave", False)]
+        + [('slider', PHI, round(v, 2)) for v in np.linspace(1.6, 2.4, 4)]
+        + [('selectbox', "Render mode", 'surface'), ('slider', "A_i (Amplitude intrinsic)", 1.4),
+           ('selectbox', "Render mode", 'markers'), ('checkbox', "Animate Wave", True)]
+    )),
+    lines3=('rtc_simulation_lines3.py', 10, (
+        [('button', "Play", None)] + [('tick', None, None)] * 10
+        + [('slider', "Intrinsic Amplitude", v) for v in (1.2, 1.4, 1.6)] + [('tick', None, None)] * 5
+        + [('slider', "Number of External Waves", 10)] + [('tick', None, None)] * 5
+        + [('slider', "Number of External Waves", 3), ('button', "Pause", None)]
+    )),
+)
+PERCENTILES = (50, 90, 99)
+# share_runtime patches AppTest internals as they are in this Streamlit
+# release; other versions may lay them out differently
+STREAMLIT_VERSION = '1.65.'
+APP_TEST_INTERNALS = ('Runtime', 'ScriptCache', 'MediaFileManager', 'MemoryMediaFileStorage',
+                      'DataframeSourceManager', 'MemoryCacheStorageManager', 'BidiComponentManager')
+
+
+def widget(at, kind, label):
+    for element in getattr(at, kind):
+        if element.label == label:
+            return element
+    raise LookupError(f"No {kind} labelled {label!r}")
+
+
+def apply(at, action, label, value):
+    if action == 'button':
+        widget(at, 'button', label).click()
+    elif action != 'tick':
+        widget(at, action, label).set_value(value)
+
+
+def rss_bytes():
+    # Resident set size of this process, from /proc (Linux)
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class PeakRSS:
+    # Samples the RSS on a background thread while active
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+def share_runtime():
+    # AppTest installs a mock Runtime and patches the config around each run,
+    # undoing both when the run ends, under sessions still running on other
+    # threads. Install one mock Runtime and the config for the whole test,
+    # and point AppTest at a subclass so its own assignments do nothing.
+    # Scripts compile once into one ScriptCache, as on the server (AppTest
+    # recompiles every run, and ast.parse is not thread-safe on 3.11)
+    from unittest.mock import MagicMock
+    import streamlit
+    from streamlit import config, logger
+    from streamlit.testing.v1 import app_test, local_script_runner
+    missing = [name for name in APP_TEST_INTERNALS if not hasattr(app_test, name)]
+    if not hasattr(local_script_runner, 'ScriptCache'):
+        missing.append('local_script_runner.ScriptCache')
+    if not streamlit.__version__.startswith(STREAMLIT_VERSION) or missing:
+        raise RuntimeError(f"load_test.py patches AppTest internals of Streamlit {STREAMLIT_VERSION}x; "
+                           f"found Streamlit {streamlit.__version__}"
+                           + (f" without {', '.join(missing)}" if missing else "")
+                           + ". Check share_runtime against this version and update STREAMLIT_VERSION")
+    Runtime = app_test.Runtime
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = app_test.MediaFileManager(app_test.MemoryMediaFileStorage('/mock/media'))
+    runtime.dataframe_source_mgr = app_test.DataframeSourceManager()
+    runtime.cache_storage_manager = app_test.MemoryCacheStorageManager()
+    runtime.bidi_component_registry = app_test.BidiComponentManager()
+    runtime.bidi_component_registry.discover_and_register_components(start_file_watching=False)
+    Runtime._instance = runtime
+    app_test.Runtime = type('SessionRuntime', (Runtime,), {})
+    script_cache = app_test.ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+    config.set_option('global.appTest', True)
+    # The apps' deprecation warnings would fill the report
+    logger.set_log_level('error')
+
+
+def run_session(script, fps, actions, steps, timeout, result):
+    # One viewer: load the app, then play `steps` actions of the script
+    from streamlit.testing.v1 import AppTest
+    latencies, ticks, errors = [], [], []
+    try:
+        at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=timeout)
+        start = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - start)
+        last = start
+        for n in range(steps):
+            action, label, value = actions[n % len(actions)]
+            apply(at, action, label, value)
+            if action == 'tick':
+                time.sleep(max(0.0, last + 1.0 / fps - time.perf_counter()))
+            start = time.perf_counter()
+            at.run()
+            latencies.append(time.perf_counter() - start)
+            if action == 'tick':
+                ticks.append(start - last)
+            last = start
+            errors.extend(e.message for e in at.exception)
+    except Exception:
+        errors.append(traceback.format_exc(limit=3))
+    result.update(latencies=latencies, ticks=ticks, errors=errors)
+
+
+def load_step(app, sessions, steps, timeout):
+    # Run `sessions` viewers at once; summary of latency, throughput, memory and CPU
+    script, fps, actions = SCENARIOS[app]
+    results = [{} for _ in range(sessions)]
+    threads = [threading.Thread(target=run_session, args=(script, fps, actions, steps, timeout, result))
+               for result in results]
+    cpu = os.times()
+    start = time.perf_counter()
+    with PeakRSS() as rss:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - start
+    cpu_end = os.times()
+    cpu_seconds = (cpu_end.user - cpu.user) + (cpu_end.system - cpu.system)
+
+    latencies = np.array([t for r in results for t in r['latencies']])
+    ticks = [t for r in results for t in r['ticks']]
+    errors = [e for r in results for e in r['errors']]
+    summary = dict(app=app, sessions=sessions, runs=int(latencies.size), wall_s=wall,
+                   throughput=latencies.size / wall, peak_rss_mib=rss.peak / 2**20,
+                   cpu_s_per_session=cpu_seconds / sessions, cpu_util=cpu_seconds / wall,
+                   tick_fps=len(ticks) / sum(ticks) if ticks else None, target_fps=fps if ticks else None,
+                   errors=len(errors), first_error=errors[0] if errors else None)
+    for p in PERCENTILES:
+        summary[f'p{p}_ms'] = float(np.percentile(latencies, p) * 1000) if latencies.size else None
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent simulated sessions against the RTC apps, offline")
+    parser.add_argument('--app', nargs='+', choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--steps', type=int, default=None, help="actions per session (default: the script once)")
+    parser.add_argument('--timeout', type=float, default=300, help="seconds allowed per script run")
+    parser.add_argument('--json', help="write the summaries to this file")
+    parser.add_argument('--max-p90-ms', type=float, help="fail if any p90 latency is above this")
+    parser.add_argument('--min-fps', type=float, help="fail if any playback tick rate is below this")
+    args = parser.parse_args(argv)
+
+    share_runtime()
+    summaries, failures = [], []
+    print(f"{'app':<7} {'N':>3} {'runs':>5} " + " ".join(f"{f'p{p} ms':>8}" for p in PERCENTILES)
+          + f" {'runs/s':>7} {'RSS MiB':>8} {'CPU s/sess':>10} {'CPU%':>5} {'tick FPS':>9} {'errors':>6}")
+    for app in args.app:
+        steps = args.steps or len(SCENARIOS[app][2])
+        for sessions in args.sessions:
+            s = load_step(app, sessions, steps, args.timeout)
+            summaries.append(s)
+            tick = f"{s['tick_fps']:.1f}/{s['target_fps']}" if s['tick_fps'] else '-'
+            print(f"{app:<7} {sessions:>3} {s['runs']:>5} "
+                  + " ".join(f"{s[f'p{p}_ms']:>8.0f}" for p in PERCENTILES)
+                  + f" {s['throughput']:>7.1f} {s['peak_rss_mib']:>8.0f} {s['cpu_s_per_session']:>10.2f}"
+                  f" {s['cpu_util']:>5.0%} {tick:>9} {s['errors']:>6}")
+            if s['errors']:
+                failures.append(f"{app} x{sessions}: {s['errors']} errors, first: {s['first_error']}")
+            if args.max_p90_ms is not None and s['p90_ms'] > args.max_p90_ms:
+                failures.append(f"{app} x{sessions}: p90 {s['p90_ms']:.0f} ms > {args.max_p90_ms:g} ms")
+            if args.min_fps is not None and s['tick_fps'] is not None and s['tick_fps'] < args.min_fps:
+                failures.append(f"{app} x{sessions}: {s['tick_fps']:.1f} FPS < {args.min_fps:g} FPS")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(summaries, f, indent=2)
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+import plotly
+import plotly.io as pio
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+from rtc_engine import WaveBank, compute_fields
+import rtc_tubes
+import rtc_area
+import rtc_lines
+from rtc_figure import figure_spec, build_figure
+
+# Stage timings (compute, colour, figure build, serialise) and Plotly JSON
+# payload per frame for the tubes, area and lines apps, over a matrix of
+# grid sizes, frame counts and external-wave counts. Results are written to
+# JSON tagged with the commit. Each stage is the median of --repeat calls,
+# with its spread; with --baseline, a stage fails the run when its median is
+# slower than the baseline's by more than --threshold plus a noise margin
+# taken from the two runs' spreads.
+#
+#   python benchmarks/run_benchmarks.py
+#   python benchmarks/run_benchmarks.py --baseline benchmarks/results/<commit>.json
+
+APPS = ('tubes', 'area', 'lines')
+STAGES = ('compute', 'colors', 'figure', 'serialise')
+PARAMS = dict(A_i=1.0, k_i=2.0, l_i=1.5, omega_i=3.0, A_e=0.8, k_e=2.5, l_e=1.8, omega_e=2.7, phi=0.0)
+
+# Cases with more grid points x frames (x waves for lines) are skipped
+DEFAULT_MAX_POINTS = 4 * 10**6
+# A slowdown must also clear NOISE_SPREADS times the larger of the two
+# runs' spreads, and never less than NOISE_FLOOR seconds, to count
+NOISE_SPREADS = 3
+NOISE_FLOOR = 0.001
+
+
+def spread(samples):
+    # Median absolute deviation, scaled to match a standard deviation
+    samples = np.asarray(samples)
+    return float(1.4826 * np.median(np.abs(samples - np.median(samples))))
+
+
+def timed(repeat, fn):
+    # (result, samples): wall times of `repeat` calls after an untimed warm-up
+    result = fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, samples
+
+
+def stage_times(**samples):
+    # Median and spread of each stage's samples
+    times = {}
+    for stage, values in samples.items():
+        times[stage] = float(np.median(values))
+        times[stage + '_spread'] = spread(values)
+    return times
+
+
+def payload(fig):
+    return pio.to_json(fig, validate=False)
+
+
+def bench_surface(module, grid, frames, repeat):
+    # Tubes and area share a shape: fields over a square grid, per-frame
+    # colours, then one static figure or a figure carrying every frame
+    x = np.linspace(-np.pi, np.pi, grid)
+    X, Y = np.meshgrid(x, x)
+    T_seq = np.linspace(0, 2 * np.pi, frames)
+    fields, t_compute = timed(repeat, lambda: compute_fields(X, Y, T_seq, **PARAMS))
+    colors, t_colors = timed(repeat, lambda: module.frame_colors(fields))
+    if frames > 1:
+        build = lambda: module.animated_figure(X, Y, fields, colors, T_seq, 100)
+    else:
+        # A rerun builds from the skeleton the app keeps in the shared cache
+        spec = figure_spec(module.create_figure(X, Y, fields.E_exp[0], fields.E_per[0], *colors[0]))
+        build = lambda: build_figure(spec, module.frame_updates(fields.E_exp[0], fields.E_per[0], *colors[0]))
+    fig, t_figure = timed(repeat, build)
+    text, t_serialise = timed(repeat, lambda: payload(fig))
+    return dict(stage_times(compute=t_compute, colors=t_colors, figure=t_figure, serialise=t_serialise),
+                payload_bytes_per_frame=len(text.encode()) / frames)
+
+
+def bench_lines(grid, frames, waves, repeat):
+    # Lines apps draw one frame per rerun, so figure and payload are per frame;
+    # the "colour" stage is the per-frame external waveform extraction
+    x = np.linspace(-np.pi, np.pi, grid)
+    T_seq = np.linspace(0, 2 * np.pi, frames)
+    bank = rtc_lines.external_bank(waves)
+    A_e, k_e, omega_e, phi_e = bank
+    fields, t_compute = timed(repeat, lambda: compute_fields(x, None, T_seq, PARAMS['A_i'], PARAMS['k_i'], 0.0,
+                                                             PARAMS['omega_i'], A_e, k_e, 0.0, omega_e, phi_e))
+    wave_bank = WaveBank(x, None, A_e, k_e, 0.0, omega_e, phi_e)
+    (psi_i, ext_waves, E_exp, E_per), t_colors = timed(
+        repeat, lambda: rtc_lines.compute_waveforms(0, T_seq[0], fields, wave_bank))
+    specs = (figure_spec(rtc_lines.plot_experience(x, T_seq[0], psi_i, ext_waves, E_exp)),
+             figure_spec(rtc_lines.plot_perception(x, T_seq[0], E_per)))
+    figs, t_figure = timed(repeat, lambda: (
+        build_figure(specs[0], *rtc_lines.experience_frame(x, T_seq[0], psi_i, ext_waves, E_exp)),
+        build_figure(specs[1], *rtc_lines.perception_frame(T_seq[0], E_per))))
+    texts, t_serialise = timed(repeat, lambda: [payload(fig) for fig in figs])
+    return dict(stage_times(compute=t_compute, colors=t_colors, figure=t_figure, serialise=t_serialise),
+                payload_bytes_per_frame=sum(len(text.encode()) for text in texts))
+
+
+def cases(args):
+    for app, grid, frames in itertools.product(args.apps, args.grid, args.frames):
+        if app == 'lines':
+            # One row of grid² samples, so the point count matches the surfaces
+            for waves in args.waves:
+                yield app, grid, frames, waves, grid * grid * max(frames, waves)
+        else:
+            yield app, grid, frames, 1, grid * grid * frames
+
+
+def run_case(app, grid, frames, waves, repeat):
+    if app == 'lines':
+        return bench_lines(grid * grid, frames, waves, repeat)
+    return bench_surface(rtc_tubes if app == 'tubes' else rtc_area, grid, frames, repeat)
+
+
+def case_key(result):
+    return f"{result['app']}/{result['grid']}/{result['frames']}/{result['waves']}"
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def regressions(results, baseline, threshold):
+    # (case, stage, baseline, current) for every stage slower than allowed.
+    # Payload sizes are exact; timings get a margin for the runs' noise
+    # (baselines without spreads count as noiseless)
+    previous = {case_key(r): r for r in baseline['results']}
+    found = []
+    for result in results:
+        base = previous.get(case_key(result))
+        if base is None:
+            continue
+        for stage in STAGES + ('payload_bytes_per_frame',):
+            limit = base[stage] * (1 + threshold)
+            if stage != 'payload_bytes_per_frame':
+                noise = max(base.get(stage + '_spread', 0.0), result[stage + '_spread'])
+                limit += max(NOISE_SPREADS * noise, NOISE_FLOOR)
+            if result[stage] > limit:
+                found.append((case_key(result), stage, base[stage], result[stage]))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stage timings and payload sizes of the RTC apps")
+    parser.add_argument('--apps', nargs='+', choices=APPS, default=list(APPS))
+    parser.add_argument('--grid', type=int, nargs='+', default=[30, 100, 300, 1000],
+                        help="points per axis (lines apps use grid² samples)")
+    parser.add_argument('--frames', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--waves', type=int, nargs='+', default=[3, 100, 1000],
+                        help="external wave counts for the lines apps")
+    parser.add_argument('--repeat', type=int, default=7, help="timed calls per stage, after one warm-up")
+    parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS,
+                        help="skip cases larger than this many grid points x frames")
+    parser.add_argument('-o', '--output', help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument('--baseline', help="results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown over the baseline before failing (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    results = []
+    print(f"{'app':<6} {'grid':>6} {'frames':>6} {'waves':>5} "
+          + ' '.join(f'{s + " ms":>12}' for s in STAGES) + f" {'KiB/frame':>10}")
+    for app, grid, frames, waves, points in cases(args):
+        if points > args.max_points:
+            print(f"{app:<6} {grid:>5}² {frames:>6} {waves:>5}   skipped ({points:,} points)")
+            continue
+        result = dict(app=app, grid=grid, frames=frames, waves=waves,
+                      **run_case(app, grid, frames, waves, args.repeat))
+        results.append(result)
+        print(f"{app:<6} {grid:>5}² {frames:>6} {waves:>5} "
+              + ' '.join(f'{result[s] * 1000:>12.1f}' for s in STAGES)
+              + f" {result['payload_bytes_per_frame'] / 1024:>10.1f}")
+
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f'{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(dict(commit=commit, created=time.strftime('%Y-%m-%dT%H:%M:%S'),
+                       python=platform.python_version(), numpy=np.__version__, plotly=plotly.__version__,
+                       results=results), f, indent=1)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.threshold)
+        for key, stage, before, after in found:
+            print(f"REGRESSION {key} {stage}: {before:.4g} -> {after:.4g} ({after / before - 1:+.0%})")
+        if found:
+            sys.exit(1)
+        print(f"No regressions against {baseline.get('commit', args.baseline)} (threshold {args.threshold:.0%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import time
+import plotly.graph_objects as go
+
+# Playback speeds offered next to the play/pause buttons
+SPEEDS = (0.5, 1, 2, 4)
+
+
+def _play_args(frame_duration):
+    return dict(frame=dict(duration=frame_duration, redraw=True),
+                transition=dict(duration=0), fromcurrent=True, mode='immediate')
+
+
+def _jump_args():
+    return dict(frame=dict(duration=0, redraw=True), transition=dict(duration=0), mode='immediate')
+
+
+def animation_controls(frame_duration, labels):
+    # Layout of the play/pause/speed buttons and the time slider for frames
+    # named 0, 1, ... with the given slider labels
+    return dict(
+        updatemenus=[
+            dict(type='buttons', direction='left', showactive=False,
+                 x=0, y=0, xanchor='left', yanchor='top', pad=dict(t=10, r=10),
+                 buttons=[
+                     dict(label='▶ Play', method='animate', args=[None, _play_args(frame_duration)]),
+                     dict(label='❚❚ Pause', method='animate',
+                          args=[[None], dict(frame=dict(duration=0, redraw=False),
+                                             transition=dict(duration=0), mode='immediate')]),
+                 ]),
+            dict(type='dropdown', direction='up', active=SPEEDS.index(1),
+                 x=0.16, y=0, xanchor='left', yanchor='top', pad=dict(t=10, r=10),
+                 buttons=[dict(label=f'{speed}×', method='animate',
+                               args=[None, _play_args(frame_duration / speed)])
+                          for speed in SPEEDS]),
+        ],
+        sliders=[dict(
+            active=0, x=0.3, len=0.7, y=0, yanchor='top', pad=dict(t=10),
+            currentvalue=dict(prefix='t = '),
+            steps=[dict(label=label, method='animate', args=[[str(n)], _jump_args()])
+                   for n, label in enumerate(labels)],
+        )],
+    )
+
+
+def add_frame_animation(fig, frames, frame_duration, traces=None, labels=None):
+    # Attach precomputed frames plus play/pause/speed controls and a time
+    # slider, so playback runs in the browser from a single figure send.
+    # `frames` is a list of trace lists; `traces` restricts which traces of
+    # `fig` each frame updates, letting frames carry only the changing data.
+    fig.frames = [go.Frame(data=data, traces=traces, name=str(n)) for n, data in enumerate(frames)]
+    labels = labels if labels is not None else [str(n) for n in range(len(frames))]
+    fig.update_layout(**animation_controls(frame_duration, labels))
+    return fig
+
+
+class PlaybackClock:
+    # Server-side playback position derived from the wall clock: the frame
+    # shown is offset + elapsed * fps, so a late tick skips frames rather
+    # than slowing the animation down. Kept in the session state.
+
+    def __init__(self):
+        self.playing = False
+        self.start = 0.0
+        self.offset = 0
+        self.fps = 1.0
+
+    def _elapsed_frames(self, now):
+        return int((now - self.start) * self.fps)
+
+    def frame(self, fps, num_frames):
+        if not self.playing:
+            return self.offset % num_frames
+        now = time.monotonic()
+        if fps != self.fps:
+            # Re-anchor so a speed change continues from the current frame
+            self.offset += self._elapsed_frames(now)
+            self.start, self.fps = now, fps
+        return (self.offset + self._elapsed_frames(now)) % num_frames
+
+    def play(self, fps):
+        if not self.playing:
+            self.playing, self.start, self.fps = True, time.monotonic(), fps
+
+    def pause(self):
+        if self.playing:
+            self.offset += self._elapsed_frames(time.monotonic())
+            self.playing = False
+
+    def reset(self):
+        self.playing, self.offset = False, 0
@@ -0,0 +1,163 @@
+import numpy as np
+import plotly.graph_objects as go
+from rtc_animation import animation_controls
+from rtc_colors import LUT_SIZE, lut_indices, map_colors, plotly_colorscale
+from rtc_figure import figure_spec, build_figure
+
+# Stages of the filled-area view (rtc_simulation_area.py), importable
+# without starting Streamlit
+
+# Colormaps for distinction
+cividis = 'cividis'
+cool = 'cool'
+
+# Grid resolutions offered in the sidebar, points per axis
+GRID_SIZES = (30, 50, 100, 150, 200, 300)
+# Prior seconds per grid point per frame to compute, build and send the
+# figure: the cost the app records on animated cache misses, 5-11e-6
+# on one core at 30-200 points per axis, rounded up
+POINT_COST = 1e-5
+
+LAYOUT = dict(
+    scene=dict(
+        xaxis_title='X (spatial)',
+        yaxis_title='Y (spatial)',
+        zaxis_title='Amplitude / Energy'
+    ),
+    height=700,
+    margin=dict(l=0, r=0, b=0, t=30)
+)
+
+
+# One colour per row from its mean, normalised over the whole grid
+def map_colors_line(Z, cmap):
+    return map_colors(Z.mean(axis=1), cmap, vmin=Z.min(), vmax=Z.max())
+
+
+# Triangle indices joining each row's curve (top) to its base, two per segment
+def ribbon_triangles(n_rows, n_cols):
+    top = (np.arange(n_rows) * 2 * n_cols)[:, None] + np.arange(n_cols - 1)
+    base = top + n_cols
+    i = np.concatenate([top, top + 1], axis=1).ravel()
+    j = np.concatenate([top + 1, base + 1], axis=1).ravel()
+    k = np.concatenate([base, base], axis=1).ravel()
+    return i, j, k
+
+
+# Row LUT indices, the numeric form of map_colors_line for a colorscale
+def line_color_indices(Z):
+    return lut_indices(Z.mean(axis=1), LUT_SIZE, vmin=Z.min(), vmax=Z.max()).astype(np.uint8)
+
+
+# Mesh vertex heights: each row's curve followed by its base
+def ribbon_z(Z, zbase=0):
+    return np.concatenate([Z, np.full_like(Z, zbase)], axis=1).ravel()
+
+
+# Outline heights, rows separated by a NaN point (null in the JSON)
+def line_z(Z):
+    return np.concatenate([Z, np.full((Z.shape[0], 1), np.nan)], axis=1).ravel()
+
+
+# Every row's filled ribbon in one Mesh3d and every outline in one Scatter3d,
+# so trace count stays at two however many rows there are. `colors` are
+# colour strings, or LUT indices when a colorscale is given
+def make_filled_surface_lines_traces(X, Y, Z, colors, name, zbase=0, colorscale=None):
+    n_rows, n_cols = Z.shape
+    i, j, k = ribbon_triangles(n_rows, n_cols)
+    if colorscale is None:
+        colors = np.asarray(colors, dtype=object)
+        mesh_colors = dict(vertexcolor=np.repeat(colors, 2 * n_cols))
+        line_colors = dict(color=np.repeat(colors, n_cols + 1))
+    else:
+        scale = dict(colorscale=colorscale, cmin=0, cmax=len(colorscale) - 1)
+        mesh_colors = dict(intensity=np.repeat(colors, 2 * n_cols), intensitymode='vertex', **scale)
+        line_colors = dict(color=np.repeat(colors, n_cols + 1), **scale)
+
+    mesh = go.Mesh3d(
+        x=np.concatenate([X, X], axis=1).ravel(),
+        y=np.concatenate([Y, Y], axis=1).ravel(),
+        z=ribbon_z(Z, zbase),
+        i=i, j=j, k=k,
+        **mesh_colors,
+        opacity=0.4,
+        name=name,
+        showscale=False,
+        flatshading=True,
+        hoverinfo='skip',
+        showlegend=True
+    )
+
+    lines = go.Scatter3d(
+        x=line_z(X),
+        y=line_z(Y),
+        z=line_z(Z),
+        mode='lines',
+        line=dict(width=4, **line_colors),
+        showlegend=False
+    )
+    return [mesh, lines]
+
+
+# (experience, perception) row colours for every frame of the fields
+def frame_colors(fields):
+    return [(map_colors_line(E_exp, cividis), map_colors_line(E_per, cool))
+            for E_exp, E_per in zip(fields.E_exp, fields.E_per)]
+
+
+def create_frame(X, Y, E_exp, E_per, exp_colors, per_colors):
+    return (make_filled_surface_lines_traces(X, Y, E_exp, exp_colors, 'Experience ψr²')
+            + make_filled_surface_lines_traces(X, Y, E_per, per_colors, 'Perception |∂ψr/∂t|'))
+
+
+def create_figure(X, Y, E_exp, E_per, exp_colors, per_colors):
+    fig = go.Figure()
+    fig.add_traces(create_frame(X, Y, E_exp, E_per, exp_colors, per_colors))
+    fig.update_layout(**LAYOUT)
+    return fig
+
+
+# (trace, attribute, value) updates taking a create_figure skeleton to a
+# frame: the heights and row colours of both ribbons and outlines
+def frame_updates(E_exp, E_per, exp_colors, per_colors):
+    updates = []
+    for trace, Z, colors in ((0, E_exp, exp_colors), (2, E_per, per_colors)):
+        colors, n_cols = np.asarray(colors, dtype=object), Z.shape[1]
+        updates += [(trace, 'z', ribbon_z(Z)), (trace, 'vertexcolor', np.repeat(colors, 2 * n_cols)),
+                    (trace + 1, 'z', line_z(Z)), (trace + 1, 'line.color', np.repeat(colors, n_cols + 1))]
+    return updates
+
+
+# All frames in one figure, played back in the browser. Frames are built
+# as dicts from the arrays on a skeleton validated once: `spec`, the
+# figure_spec of a create_figure for this grid, or one made here
+def animated_figure(X, Y, fields, colors, T_seq, frame_delay, spec=None):
+    if spec is None:
+        spec = figure_spec(create_figure(X, Y, fields.E_exp[0], fields.E_per[0], *colors[0]))
+    frames = [frame_updates(E_exp, E_per, *frame_color)
+              for E_exp, E_per, frame_color in zip(fields.E_exp, fields.E_per, colors)]
+    z_max = max(fields.E_exp.max(), fields.E_per.max())
+    layout = dict(animation_controls(frame_delay, [f'{t:.2f}' for t in T_seq]))
+    layout['scene.zaxis.range'] = [0, z_max * 1.05]
+    return build_figure(spec, frames[0], layout, frames=frames)
+
+
+# Figure for the delta chart: the same traces with LUT indices mapped by
+# colorscales in the browser, so frames only carry heights and indices
+def delta_skeleton(X, Y, E_exp, E_per):
+    fig = go.Figure()
+    for Z, cmap, name in ((E_exp, cividis, 'Experience ψr²'), (E_per, cool, 'Perception |∂ψr/∂t|')):
+        fig.add_traces(make_filled_surface_lines_traces(X, Y, Z, line_color_indices(Z), name,
+                                                        colorscale=plotly_colorscale(cmap)))
+    fig.update_layout(**LAYOUT)
+    return fig
+
+
+# (trace, attribute, array) updates taking the delta skeleton to this frame
+def delta_frame(E_exp, E_per):
+    updates = []
+    for trace, Z in ((0, E_exp), (2, E_per)):
+        rows, n_cols = line_color_indices(Z), Z.shape[1]
+        updates += [(trace, 'z', ribbon_z(Z)), (trace, 'intensity', np.repeat(rows, 2 * n_cols)),
+                    (trace + 1, 'z', line_z(Z)), (trace + 1, 'line.color', np.repeat(rows, n_cols + 1))]
+    return updates
@@ -0,0 +1,229 @@
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import warnings
+from functools import lru_cache
+import numpy as np
+from rtc_engine import Fields, bank_params, compute_fields
+from rtc_tiles import DEFAULT_WORKERS, tiled_fields
+
+# Interchangeable implementations of the whole per-point resonance kernel,
+# from the wave phases to psi_r, E_exp = psi_r² and E_per = |∂psi_r/∂t|.
+# NumPy evaluates it as a chain of array operations, one memory pass per
+# intermediate; 'tiled' runs the same NumPy chain on cache-sized tiles over
+# RTC_WORKERS threads (rtc_tiles); numexpr and Numba, when installed, run it
+# as fused multi-threaded loops. Backends are picked by name, by
+# RTC_BACKEND, or automatically (the first installed of BACKENDS).
+#
+#   RTC_BACKEND=numexpr streamlit run streamlit_app.py
+#   python rtc_backends.py        # every backend against NumPy
+
+# Preference order for 'auto'; tiled and numpy are always available
+BACKENDS = ('numba', 'numexpr', 'tiled', 'numpy')
+DEFAULT_BACKEND = os.environ.get('RTC_BACKEND', 'auto')
+# Largest deviation from NumPy, relative to the field's magnitude, that
+# check_backends accepts (sin/cos differ between libraries by a few ulps)
+TOLERANCE = 1e-9
+
+
+def _flat_inputs(X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi):
+    # Flattened grid, times and per-wave parameter arrays shared by the fused backends
+    grid = np.shape(X)
+    x = np.ascontiguousarray(X, dtype=float).ravel()
+    y = np.zeros_like(x) if Y is None else np.ascontiguousarray(Y, dtype=float).ravel()
+    T_seq = np.atleast_1d(np.asarray(T_seq, dtype=float))
+    intrinsic = tuple(float(p) for p in (A_i, k_i, l_i, omega_i))
+    extrinsic = tuple(np.ascontiguousarray(p) for p in bank_params(A_e, k_e, l_e, omega_e, phi))
+    return grid, x, y, T_seq, intrinsic, extrinsic
+
+
+def _empty_fields(frames, points):
+    return Fields(*(np.empty((frames, points)) for _ in Fields._fields))
+
+
+def _shaped(fields, grid):
+    return Fields(*(a.reshape((-1,) + grid) for a in fields))
+
+
+class NumpyBackend:
+    name = 'numpy'
+
+    def fields(self, X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi=0.0):
+        return compute_fields(X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi)
+
+
+class TiledBackend:
+    # The NumPy chain per L2-sized tile, tiles spread over a thread pool
+    name = 'tiled'
+
+    def __init__(self, workers=None):
+        self.workers = workers or DEFAULT_WORKERS
+
+    def fields(self, X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi=0.0):
+        return tiled_fields(X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi,
+                            workers=self.workers)
+
+
+class NumexprBackend:
+    # One blocked, multi-threaded pass per wave and per output; the phase and
+    # the sums of psi_r and ∂psi_r/∂t never exist as full arrays
+    name = 'numexpr'
+
+    def __init__(self):
+        import numexpr
+        self._evaluate = numexpr.evaluate
+
+    def fields(self, X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi=0.0):
+        grid, x, y, T_seq, (A, k, l, w), bank = _flat_inputs(X, Y, T_seq, A_i, k_i, l_i, omega_i,
+                                                             A_e, k_e, l_e, omega_e, phi)
+        ev = self._evaluate
+        out = _empty_fields(T_seq.size, x.size)
+        t = T_seq[:, None]
+        # ∂psi_i/∂t and ∂psi_e/∂t are parked in the psi_r and E_per buffers
+        dpsi_i_dt, dpsi_e_dt = out.psi_r, out.E_per
+        names = dict(x=x, y=y, t=t, A=A, k=k, l=l, w=w, p=0.0)
+        ev('A * sin(k*x + l*y + p - w*t)', local_dict=names, out=out.psi_i)
+        ev('-A*w * cos(k*x + l*y + p - w*t)', local_dict=names, out=dpsi_i_dt)
+        for j, (A, k, l, w, p) in enumerate(zip(*bank)):
+            names = dict(x=x, y=y, t=t, A=A, k=k, l=l, w=w, p=p, psi=out.psi_e, dpsi=dpsi_e_dt)
+            ev(('psi + ' if j else '') + 'A * sin(k*x + l*y + p - w*t)', local_dict=names, out=out.psi_e)
+            ev(('dpsi + ' if j else '') + '-A*w * cos(k*x + l*y + p - w*t)', local_dict=names, out=dpsi_e_dt)
+        names = dict(pi=out.psi_i, pe=out.psi_e, dpi=dpsi_i_dt, dpe=dpsi_e_dt)
+        ev('abs(dpi + dpe + dpi*pe + dpe*pi)', local_dict=names, out=out.E_per)
+        ev('pi + pe + pi*pe', local_dict=names, out=out.psi_r)
+        ev('r*r', local_dict=dict(r=out.psi_r), out=out.E_exp)
+        return _shaped(out, grid)
+
+
+class NumbaBackend:
+    # A single parallel loop over every (frame, point): each point's phases,
+    # sin/cos and resonance terms stay in registers
+    name = 'numba'
+
+    def __init__(self):
+        self._kernel = _numba_kernel()
+
+    def fields(self, X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi=0.0):
+        grid, x, y, T_seq, intrinsic, bank = _flat_inputs(X, Y, T_seq, A_i, k_i, l_i, omega_i,
+                                                          A_e, k_e, l_e, omega_e, phi)
+        out = _empty_fields(T_seq.size, x.size)
+        self._kernel(x, y, T_seq, *intrinsic, *bank, *out)
+        return _shaped(out, grid)
+
+
+@lru_cache(maxsize=None)
+def _numba_kernel():
+    # Compiled on first use (and cached next to the module) so importing
+    # this module never pays for Numba
+    import math
+    import numba
+    if 'NUMBA_THREADING_LAYER' not in os.environ:
+        # Streamlit runs every session in its own script thread: OpenMP is
+        # safe to enter from several at once, and TBB's pool, once used from
+        # a non-main thread, keeps the interpreter from exiting
+        numba.config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+
+    @numba.njit(parallel=True, cache=True)
+    def kernel(x, y, t, A_i, k_i, l_i, w_i, A_e, k_e, l_e, w_e, phi_e, psi_i, psi_e, psi_r, E_exp, E_per):
+        points = x.size
+        for n in numba.prange(t.size * points):
+            f = n // points
+            g = n - f * points
+            phase = k_i * x[g] + l_i * y[g] - w_i * t[f]
+            pi = A_i * math.sin(phase)
+            dpi = -A_i * w_i * math.cos(phase)
+            pe = 0.0
+            dpe = 0.0
+            for j in range(A_e.size):
+                phase = k_e[j] * x[g] + l_e[j] * y[g] + phi_e[j] - w_e[j] * t[f]
+                pe += A_e[j] * math.sin(phase)
+                dpe += -A_e[j] * w_e[j] * math.cos(phase)
+            r = pi + pe + pi * pe
+            psi_i[f, g] = pi
+            psi_e[f, g] = pe
+            psi_r[f, g] = r
+            E_exp[f, g] = r * r
+            E_per[f, g] = abs(dpi + dpe + dpi * pe + dpe * pi)
+
+    return kernel
+
+
+BACKEND_CLASSES = dict(numpy=NumpyBackend, tiled=TiledBackend, numexpr=NumexprBackend, numba=NumbaBackend)
+
+
+def installed(name):
+    # Whether a backend's library can be imported, without importing it
+    return name in ('numpy', 'tiled') or importlib.util.find_spec(name) is not None
+
+
+def available_backends():
+    return tuple(name for name in BACKENDS if installed(name))
+
+
+@lru_cache(maxsize=None)
+def get_backend(name=DEFAULT_BACKEND):
+    # Backend by name; 'auto' takes the first installed one, and a requested
+    # backend whose library is missing falls back to NumPy with a warning
+    if name == 'auto':
+        name = available_backends()[0]
+    if name not in BACKEND_CLASSES:
+        raise ValueError(f"Unknown compute backend {name!r}; choose from auto, {', '.join(BACKENDS)}")
+    if not installed(name):
+        warnings.warn(f"Compute backend {name!r} is not installed; using numpy", stacklevel=2)
+        name = 'numpy'
+    return BACKEND_CLASSES[name]()
+
+
+def check_backends(X, Y, T_seq, *params, backends=None, tolerance=TOLERANCE):
+    # {backend: {field: deviation}} of every installed backend from NumPy,
+    # each deviation relative to the field's largest magnitude, and whether
+    # all of them are within tolerance
+    reference = NumpyBackend().fields(X, Y, T_seq, *params)
+    deviations = {}
+    for name in backends or available_backends():
+        result = get_backend(name).fields(X, Y, T_seq, *params)
+        deviations[name] = {field: float(np.abs(got - ref).max() / max(np.abs(ref).max(), 1.0))
+                            for field, got, ref in zip(Fields._fields, result, reference)}
+    ok = all(d <= tolerance for fields in deviations.values() for d in fields.values())
+    return deviations, ok
+
+
+# Cases check_backends runs from the command line: the 2D tubes/area
+# field, a bank of external waves, and the 1D line apps (Y=None)
+CHECK_CASES = dict(
+    single=lambda x: (np.meshgrid(x, x), (1.0, 2.0, 1.5, 3.0, 0.8, 2.5, 1.8, 2.7, np.pi / 4)),
+    bank=lambda x: (np.meshgrid(x, x), (1.0, 2.0, 1.5, 3.0, [0.8, 0.5, 0.3], [2.5, 1.0, 4.0], [1.8, 0.7, 2.2],
+                                        [2.7, 1.3, 4.1], [np.pi / 4, 0.0, 1.0])),
+    lines=lambda x: ((x, None), (1.0, 2.0, 0.0, 3.0, [0.8, 0.5], [2.5, 1.0], 0.0, [2.7, 1.3], [0.3, 1.1])),
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check every installed compute backend against NumPy and time it")
+    parser.add_argument('--grid', type=int, default=200, help="grid points per axis")
+    parser.add_argument('--frames', type=int, default=40)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    x = np.linspace(-np.pi, np.pi, args.grid)
+    T_seq = np.linspace(0, 2 * np.pi, args.frames)
+    passed = True
+    print(f"{'case':<8} {'backend':<8} {'deviation':>10} {'ms':>9}")
+    for case, make in CHECK_CASES.items():
+        (X, Y), params = make(x)
+        deviations, ok = check_backends(X, Y, T_seq, *params, tolerance=args.tolerance)
+        passed = passed and ok
+        for name, fields in deviations.items():
+            backend = get_backend(name)
+            start = time.perf_counter()
+            backend.fields(X, Y, T_seq, *params)
+            elapsed = time.perf_counter() - start
+            print(f"{case:<8} {name:<8} {max(fields.values()):>10.1e} {elapsed * 1000:>9.1f}")
+    print("all backends agree" if passed else f"deviation above {args.tolerance:g}")
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Byte budget of the process-wide cache, overridable from the environment
+DEFAULT_MAX_BYTES = int(os.environ.get("RTC_CACHE_BYTES", 256 * 2**20))
+
+
+def _feed(h, value):
+    # Canonical, type-tagged encoding so equal parameters hash equally
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        h.update(f"a{value.dtype.str}{value.shape}".encode())
+        h.update(value.tobytes())
+    elif isinstance(value, (bool, np.bool_)):
+        h.update(b"b1" if value else b"b0")
+    elif isinstance(value, (int, float, np.integer, np.floating)):
+        h.update(b"f" + repr(float(value)).encode())
+    elif isinstance(value, str):
+        h.update(b"s%d:" % len(value) + value.encode())
+    elif value is None:
+        h.update(b"n")
+    elif isinstance(value, (tuple, list)):
+        h.update(b"l%d" % len(value))
+        for item in value:
+            _feed(h, item)
+    elif isinstance(value, dict):
+        h.update(b"d%d" % len(value))
+        for name in sorted(value):
+            _feed(h, name)
+            _feed(h, value[name])
+    else:
+        raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+
+
+def param_key(*parts, **params):
+    # Hash of the wave parameters, grid and T_seq (or any other parts)
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, parts)
+    _feed(h, params)
+    return h.hexdigest()
+
+
+def nbytes(value):
+    # Memory held by a cached value, counting the arrays inside containers
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(nbytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+def freeze(value):
+    # Cached values are shared between sessions, so make their arrays read-only
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            freeze(v)
+    elif isinstance(value, dict):
+        for v in value.values():
+            freeze(v)
+    return value
+
+
+class FrameCache:
+    # Thread-safe LRU cache of frame stacks and colour arrays, evicting the
+    # least recently used entries once the stored bytes exceed max_bytes
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def touch(self, key):
+        # Mark an entry as recently used without counting a lookup
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def put(self, key, value):
+        value = freeze(value)
+        size = nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            # Values bigger than the whole budget are returned but not kept
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.bytes += size
+                self._evict()
+        return value
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = self.put(key, compute())
+        return value
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(entries=len(self._entries), bytes=self.bytes, max_bytes=self.max_bytes,
+                        hits=self.hits, misses=self.misses, evictions=self.evictions,
+                        hit_rate=self.hits / lookups if lookups else 0.0)
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+
+_MISSING = object()
+
+# Shared by every Streamlit session in this server process
+frame_cache = FrameCache()
+
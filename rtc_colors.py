@@ -0,0 +1,102 @@
+import os
+import sys
+import warnings
+from functools import lru_cache
+import numpy as np
+
+# Default number of entries in a colormap lookup table
+LUT_SIZE = 256
+
+# Lookup tables the apps use, shipped precomputed so matplotlib is only
+# imported for other colormaps; rebuild with `python rtc_colors.py`
+COLORMAP_TABLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'colormaps.npz')
+TABLE_COLORMAPS = ('viridis', 'plasma', 'cividis', 'cool', 'jet')
+TABLE_SIZES = (LUT_SIZE, 100)
+
+
+def sample_colormap(name, n=LUT_SIZE):
+    # (n, 3) uint8 RGB table sampled from matplotlib
+    import matplotlib
+    rgba = matplotlib.colormaps[name].resampled(n)(np.arange(n))
+    return (rgba[:, :3] * 255).astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def _shipped_tables():
+    if not os.path.exists(COLORMAP_TABLES):
+        return {}
+    with np.load(COLORMAP_TABLES) as tables:
+        return {name: tables[name] for name in tables.files}
+
+
+@lru_cache(maxsize=None)
+def colormap_lut(name, n=LUT_SIZE):
+    # (n, 3) uint8 RGB table, from the shipped tables when present
+    lut = _shipped_tables().get(f'{name}_{n}')
+    if lut is None:
+        lut = sample_colormap(name, n)
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=None)
+def colormap_strings(name, n=LUT_SIZE):
+    # The same table as Plotly 'rgb(r, g, b)' strings, indexed like the LUT
+    strings = np.array([f'rgb({r}, {g}, {b})' for r, g, b in colormap_lut(name, n).tolist()], dtype=object)
+    strings.flags.writeable = False
+    return strings
+
+
+def value_range(Z, vmin=None, vmax=None):
+    # Colour limits for Z; a flat range cannot be normalised, so it is
+    # reported and widened to keep every value at the bottom of the colormap
+    Z = np.asarray(Z)
+    vmin = Z.min() if vmin is None else vmin
+    vmax = Z.max() if vmax is None else vmax
+    if not vmax > vmin:
+        warnings.warn(f"Colour range is flat (min == max == {vmin:g}); "
+                      "mapping all values to the start of the colormap", RuntimeWarning, stacklevel=2)
+        vmax = vmin + 1.0
+    return vmin, vmax
+
+
+def lut_indices(Z, n=LUT_SIZE, vmin=None, vmax=None):
+    # Integer LUT index per value, binned the way matplotlib colormaps do
+    vmin, vmax = value_range(Z, vmin, vmax)
+    scaled = (np.asarray(Z, dtype=float) - vmin) * (n / (vmax - vmin))
+    return np.clip(scaled, 0, n - 1).astype(np.intp)
+
+
+def map_rgb(Z, name, n=LUT_SIZE, vmin=None, vmax=None):
+    # uint8 RGB array of shape Z.shape + (3,)
+    return colormap_lut(name, n)[lut_indices(Z, n, vmin, vmax)]
+
+
+def map_colors(Z, name, n=LUT_SIZE, vmin=None, vmax=None):
+    # Array of 'rgb(r, g, b)' strings, one per value of Z
+    return colormap_strings(name, n)[lut_indices(Z, n, vmin, vmax)]
+
+
+@lru_cache(maxsize=None)
+def plotly_colorscale(name, n=LUT_SIZE):
+    # Colorscale for Plotly so the browser maps numeric values itself
+    positions = np.linspace(0, 1, n)
+    return tuple((float(p), c) for p, c in zip(positions, colormap_strings(name, n)))
+
+
+def marker_colors(Z, name, n=LUT_SIZE, client=False):
+    # Marker colour properties for Z, normalised over Z's own range: either
+    # RGB strings from the lookup table, or the raw values plus a colorscale
+    if client:
+        vmin, vmax = value_range(Z)
+        return dict(color=np.asarray(Z), colorscale=plotly_colorscale(name, n), cmin=vmin, cmax=vmax)
+    return dict(color=map_colors(Z, name, n))
+
+
+def build_tables(path=COLORMAP_TABLES, names=TABLE_COLORMAPS, sizes=TABLE_SIZES):
+    np.savez_compressed(path, **{f'{name}_{n}': sample_colormap(name, n) for name in names for n in sizes})
+
+
+if __name__ == '__main__':
+    build_tables(*sys.argv[1:2])
+    print(f"Wrote {sys.argv[1] if len(sys.argv) > 1 else COLORMAP_TABLES}")
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import plotly.io as pio
+
+# Delta chart: a custom Streamlit component that keeps one Plotly figure
+# alive in the browser. The figure skeleton (coordinates, layout, trace
+# structure) is sent once per session; after that each rerun sends only the
+# arrays that change, packed into one binary buffer of float32/uint8 views
+# and applied with Plotly.restyle. A buffer holding several frames is
+# played back in the browser at `interval` ms per frame.
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'components', 'delta_chart')
+# Every array starts on this boundary so the browser can view it in place
+ALIGN = 8
+
+_component = None
+
+
+def _declare():
+    # The frontend ships with its own plotly.js (v4.1.1, the bundle of the
+    # plotly 7.1 Python package), so it needs no write access or network at
+    # runtime. To upgrade, copy plotly/package_data/plotly.min.js over it
+    global _component
+    if _component is None:
+        import streamlit.components.v1 as components
+        _component = components.declare_component('delta_chart', path=FRONTEND_DIR)
+    return _component
+
+
+def wire_dtype(array):
+    # Floats travel as float32, small unsigned ints (LUT indices) as uint8
+    if array.dtype.kind == 'f':
+        return np.dtype(np.float32)
+    if array.dtype == np.uint8 or array.dtype == np.bool_:
+        return np.dtype(np.uint8)
+    return np.dtype(np.int32)
+
+
+def pack_frames(frames):
+    # frames: one list of (trace, attribute, array) updates per frame, the
+    # same attributes and shapes in every frame. Returns (specs, frame_bytes,
+    # buffer) with frame f's arrays at f * frame_bytes + spec['offset']
+    specs, offset = [], 0
+    for trace, attr, array in frames[0]:
+        array = np.asarray(array)
+        dtype = wire_dtype(array)
+        spec = dict(trace=trace, attr=attr, dtype=dtype.name, offset=offset, count=array.size)
+        if array.ndim == 2:
+            spec['rows'] = array.shape[0]
+        specs.append(spec)
+        offset += -(-array.size * dtype.itemsize // ALIGN) * ALIGN
+    buffer = np.zeros(len(frames) * offset, dtype=np.uint8)
+    for f, updates in enumerate(frames):
+        for spec, (_, _, array) in zip(specs, updates):
+            data = np.ascontiguousarray(array, dtype=spec['dtype']).view(np.uint8).ravel()
+            start = f * offset + spec['offset']
+            buffer[start:start + data.size] = data
+    return specs, offset, buffer.tobytes()
+
+
+def delta_chart(skeleton, skeleton_id, frames=(), layout=None, interval=0, height=700, key='delta_chart'):
+    # Show `skeleton()` (a go.Figure, built only when the browser needs it)
+    # and apply the frame updates; returns the bytes sent on this rerun
+    import streamlit as st
+    sent_key, nonce_key = f'_delta_sent_{key}', f'_delta_nonce_{key}'
+    resend = st.session_state.get(sent_key) != skeleton_id
+    # A remounted iframe has lost the skeleton and asks for it by id
+    request = st.session_state.get(key)
+    if isinstance(request, dict) and request.get('nonce') != st.session_state.get(nonce_key):
+        st.session_state[nonce_key] = request.get('nonce')
+        resend = True
+
+    skeleton_json = pio.to_json(skeleton(), validate=False) if resend else None
+    specs, frame_bytes, buffer = pack_frames(frames) if frames else ([], 0, None)
+    _declare()(skeleton=skeleton_json, skeleton_id=skeleton_id, specs=specs, frame_bytes=frame_bytes,
+               buffer=buffer, layout=layout, interval=interval, height=height, key=key, default=None)
+    st.session_state[sent_key] = skeleton_id
+    return dict(skeleton_bytes=len(skeleton_json.encode()) if skeleton_json else 0,
+                frame_bytes=frame_bytes, frames=len(frames))
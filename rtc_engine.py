@@ -0,0 +1,328 @@
+import numpy as np
+from collections import namedtuple
+
+# Resonance field stacks, one array per quantity, shaped (T,) + grid shape
+Fields = namedtuple("Fields", ["psi_i", "psi_e", "psi_r", "E_exp", "E_per"])
+
+# Wave parameters in the order compute_waves/compute_fields take them
+WAVE_PARAMS = ('A_i', 'k_i', 'l_i', 'omega_i', 'A_e', 'k_e', 'l_e', 'omega_e', 'phi')
+
+
+# Cap on elements of the (frames, K, grid) phase buffers in wave_bank_sum
+BANK_BUFFER_ELEMENTS = 2**22
+
+# Rotated phasors are pulled back onto the unit circle every this many frames
+RENORM_EVERY = 32
+
+
+def time_axis(T_seq, ndim):
+    # Column of times that broadcasts against a grid with `ndim` dimensions
+    return np.asarray(T_seq, dtype=float).reshape((-1,) + (1,) * ndim)
+
+
+def wave_phase(X, Y, T_seq, k, l, omega, phi=0.0):
+    # k*X + l*Y - omega*t + phi for every t at once; Y=None for 1D waves
+    X = np.asarray(X, dtype=float)
+    spatial = k * X if Y is None else k * X + l * np.asarray(Y, dtype=float)
+    return spatial + phi - omega * time_axis(T_seq, X.ndim)
+
+
+def wave(X, Y, T_seq, A, k, l, omega, phi=0.0):
+    # Evaluate the phase once and reuse it for both psi and d(psi)/dt
+    phase = wave_phase(X, Y, T_seq, k, l, omega, phi)
+    psi = A * np.sin(phase)
+    dpsi_dt = (-A * omega) * np.cos(phase)
+    return psi, dpsi_dt
+
+
+def bank_params(A, k, l, omega, phi=0.0):
+    # Parameters of a bank of K waves as equal-length 1D float arrays
+    params = (np.atleast_1d(np.asarray(p, dtype=float)) for p in (A, k, l, omega, phi))
+    return np.broadcast_arrays(*params)
+
+
+def bank_spatial(X, Y, k, l, phi):
+    # (K, G) spatial phase k*X + l*Y + phi of every wave over the flattened grid
+    spatial = np.multiply.outer(k, np.asarray(X, dtype=float).ravel())
+    if Y is not None:
+        spatial += np.multiply.outer(l, np.asarray(Y, dtype=float).ravel())
+    spatial += phi[:, None]
+    return spatial
+
+
+def _bank_phases(spatial, omega, t, phase, sines):
+    # Fill the (c, K, G) buffers for times t: sines gets sin(phase) and the
+    # phase buffer is overwritten with cos(phase)
+    np.multiply(t[:, None, None], omega[:, None], out=phase)
+    np.subtract(spatial, phase, out=phase)
+    np.sin(phase, out=sines)
+    np.cos(phase, out=phase)
+
+
+def wave_bank(X, Y, T_seq, A, k, l, omega, phi=0.0):
+    # K waves evaluated in one broadcast pass over a shared (T, K, G) phase
+    # matrix. Returns the summed psi and d(psi)/dt, reduced over K with a
+    # matrix product, and the individual waves as a view shaped (T, K) + grid.
+    A, k, l, omega, phi = bank_params(A, k, l, omega, phi)
+    grid = np.shape(X)
+    T_seq = np.atleast_1d(np.asarray(T_seq, dtype=float))
+    spatial = bank_spatial(X, Y, k, l, phi)
+    phase = np.empty((T_seq.size,) + spatial.shape)
+    waves = np.empty_like(phase)
+    _bank_phases(spatial, omega, T_seq, phase, waves)
+    psi_sum = np.matmul(A, waves)
+    dpsi_sum = np.matmul(-A * omega, phase)
+    waves *= A[:, None]
+    return (psi_sum.reshape((-1,) + grid), dpsi_sum.reshape((-1,) + grid),
+            waves.reshape((-1, A.size) + grid))
+
+
+def wave_bank_sum(X, Y, T_seq, A, k, l, omega, phi=0.0, max_elements=BANK_BUFFER_ELEMENTS):
+    # Summed psi and d(psi)/dt of K waves, streamed over chunks of frames so
+    # the phase buffers are allocated once and stay within max_elements
+    A, k, l, omega, phi = bank_params(A, k, l, omega, phi)
+    grid = np.shape(X)
+    T_seq = np.atleast_1d(np.asarray(T_seq, dtype=float))
+    spatial = bank_spatial(X, Y, k, l, phi)
+    chunk = int(min(T_seq.size, max(1, max_elements // spatial.size)))
+    phase = np.empty((chunk,) + spatial.shape)
+    sines = np.empty_like(phase)
+    psi_sum = np.empty((T_seq.size, spatial.shape[1]))
+    dpsi_sum = np.empty_like(psi_sum)
+    dA = -A * omega
+    for start in range(0, T_seq.size, chunk):
+        t = T_seq[start:start + chunk]
+        stop = start + t.size
+        _bank_phases(spatial, omega, t, phase[:t.size], sines[:t.size])
+        np.matmul(A, sines[:t.size], out=psi_sum[start:stop])
+        np.matmul(dA, phase[:t.size], out=dpsi_sum[start:stop])
+    return psi_sum.reshape((-1,) + grid), dpsi_sum.reshape((-1,) + grid)
+
+
+class WaveBank:
+    # The K individual waves of a bank at one time t, for drawing them: one
+    # (K, G) buffer allocated once and refilled in place for each frame, so
+    # memory stays at one frame's waves however many frames there are. The
+    # sums over K come from wave_bank_sum (or a backend) instead.
+
+    def __init__(self, X, Y, A, k, l, omega, phi=0.0):
+        A, k, l, omega, phi = bank_params(A, k, l, omega, phi)
+        self.grid = np.shape(X)
+        self._x = np.asarray(X, dtype=float).ravel()
+        self._y = None if Y is None else np.asarray(Y, dtype=float).ravel()
+        self._A, self._k, self._l, self._omega, self._phi = A[:, None], k, l, omega, phi
+        self._waves = np.empty((A.size, self._x.size))
+
+    @property
+    def nbytes(self):
+        return self._waves.nbytes
+
+    def evaluate(self, t):
+        # A*sin(k*X + l*Y - omega*t + phi) shaped (K,) + grid, a view of the
+        # buffer that the next call overwrites
+        waves = self._waves
+        np.multiply.outer(self._k, self._x, out=waves)
+        if self._y is not None:
+            # 2D grids take one temporary for the l*Y term
+            waves += np.multiply.outer(self._l, self._y)
+        waves += (self._phi - self._omega * t)[:, None]
+        np.sin(waves, out=waves)
+        waves *= self._A
+        return waves.reshape((-1,) + self.grid)
+
+
+def uniform_step(T_seq):
+    # Spacing of an evenly spaced T_seq; phase rotation needs a constant dt
+    T_seq = np.asarray(T_seq, dtype=float)
+    if T_seq.size < 2:
+        return 0.0
+    dt = (T_seq[-1] - T_seq[0]) / (T_seq.size - 1)
+    if not np.allclose(np.diff(T_seq), dt, rtol=1e-9, atol=1e-12 * np.abs(T_seq).max()):
+        raise ValueError("Incremental stepping needs evenly spaced times in T_seq")
+    return dt
+
+
+def rotating_phasors(spatial, omega, T_seq, renorm_every=RENORM_EVERY):
+    # Yield z = exp(i*(spatial - omega*t)) for each t in T_seq, so that
+    # z.imag/z.real are the sin/cos of the phase. Only the first frame calls
+    # exp; later ones advance by the constant rotation exp(-i*omega*dt), a
+    # complex multiply-add per point. The yielded array is updated in place.
+    T_seq = np.asarray(T_seq, dtype=float)
+    dt = uniform_step(T_seq)
+    z = np.exp(1j * (spatial - omega[:, None] * T_seq[0]))
+    step = np.exp(-1j * omega * dt)[:, None]
+    for n in range(T_seq.size):
+        if n:
+            z *= step
+            if n % renorm_every == 0:
+                z /= np.abs(z)
+        yield z
+
+
+def rotation_error_bound(n_steps, max_phase):
+    # Documented bound on |sin|/|cos| error of rotated phasors against direct
+    # evaluation, per unit amplitude. Each rotation adds at most a few ulps of
+    # angle error (measured below 1.2 eps per step over 10^4 frames), which
+    # renormalisation keeps from also growing the magnitude; direct evaluation
+    # itself rounds its argument to about max_phase * eps.
+    eps = np.finfo(float).eps
+    return (4 * n_steps + 2 * max_phase + 4) * eps
+
+
+def rotating_wave_bank_sum(X, Y, T_seq, A, k, l, omega, phi=0.0, renorm_every=RENORM_EVERY):
+    # wave_bank_sum by incremental stepping; T_seq must be evenly spaced
+    A, k, l, omega, phi = bank_params(A, k, l, omega, phi)
+    grid = np.shape(X)
+    T_seq = np.atleast_1d(np.asarray(T_seq, dtype=float))
+    spatial = bank_spatial(X, Y, k, l, phi)
+    psi_sum = np.empty((T_seq.size, spatial.shape[1]))
+    dpsi_sum = np.empty_like(psi_sum)
+    dA = -A * omega
+    for n, z in enumerate(rotating_phasors(spatial, omega, T_seq, renorm_every)):
+        np.matmul(A, z.imag, out=psi_sum[n])
+        np.matmul(dA, z.real, out=dpsi_sum[n])
+    return psi_sum.reshape((-1,) + grid), dpsi_sum.reshape((-1,) + grid)
+
+
+def check_rotation_accuracy(X, Y, T_seq, k, l, omega, phi=0.0, renorm_every=RENORM_EVERY):
+    # Largest deviation of rotated sin/cos from direct evaluation over
+    # T_seq, returned with the bound it must stay within
+    _, k, l, omega, phi = bank_params(1.0, k, l, omega, phi)
+    T_seq = np.atleast_1d(np.asarray(T_seq, dtype=float))
+    spatial = bank_spatial(X, Y, k, l, phi)
+    error = max_phase = 0.0
+    for n, z in enumerate(rotating_phasors(spatial, omega, T_seq, renorm_every)):
+        phase = spatial - omega[:, None] * T_seq[n]
+        error = max(error, np.abs(z.imag - np.sin(phase)).max(), np.abs(z.real - np.cos(phase)).max())
+        max_phase = max(max_phase, np.abs(phase).max())
+    return error, rotation_error_bound(T_seq.size - 1, max_phase)
+
+
+def resonance_terms(psi_i, dpsi_i_dt, psi_e, dpsi_e_dt):
+    # psi_r and its signed time derivative
+    psi_r = psi_i + psi_e + psi_i * psi_e
+    dpsi_r_dt = dpsi_i_dt + dpsi_e_dt + dpsi_i_dt * psi_e + dpsi_e_dt * psi_i
+    return psi_r, dpsi_r_dt
+
+
+def resonance(psi_i, dpsi_i_dt, psi_e, dpsi_e_dt):
+    psi_r, dpsi_r_dt = resonance_terms(psi_i, dpsi_i_dt, psi_e, dpsi_e_dt)
+    E_exp = psi_r ** 2
+    E_per = np.abs(dpsi_r_dt)
+    return psi_r, E_exp, E_per
+
+
+class Workspace:
+    # Preallocated buffers for evaluating the field one frame at a time with
+    # out= ufuncs and in-place arithmetic, so a frame allocates nothing.
+    # dtype=np.float32 is an opt-in policy that halves memory traffic when
+    # the output is only plotted.
+
+    def __init__(self, X, Y, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi=0.0, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.grid = np.shape(X)
+        self._intrinsic = self._bank(X, Y, A_i, k_i, l_i, omega_i, 0.0)
+        self._extrinsic = self._bank(X, Y, A_e, k_e, l_e, omega_e, phi)
+        size = int(np.prod(self.grid))
+        self.psi_i, self.dpsi_i_dt, self.psi_e, self.dpsi_e_dt, self.psi_r, self.E_exp, self.E_per = (
+            np.empty(size, self.dtype) for _ in range(7))
+
+    def _bank(self, X, Y, A, k, l, omega, phi):
+        A, k, l, omega, phi = bank_params(A, k, l, omega, phi)
+        spatial = bank_spatial(X, Y, k, l, phi).astype(self.dtype)
+        return dict(A=A.astype(self.dtype), dA=(-A * omega).astype(self.dtype),
+                    omega=omega.astype(self.dtype)[:, None], spatial=spatial,
+                    phase=np.empty_like(spatial), sines=np.empty_like(spatial))
+
+    def _evaluate_bank(self, bank, t, psi, dpsi_dt):
+        phase = bank['phase']
+        np.multiply(bank['omega'], self.dtype.type(t), out=phase)
+        np.subtract(bank['spatial'], phase, out=phase)
+        np.sin(phase, out=bank['sines'])
+        np.cos(phase, out=phase)
+        np.matmul(bank['A'], bank['sines'], out=psi)
+        np.matmul(bank['dA'], phase, out=dpsi_dt)
+
+    @property
+    def nbytes(self):
+        banks = sum(a.nbytes for bank in (self._intrinsic, self._extrinsic) for a in bank.values())
+        return banks + 7 * self.psi_r.nbytes
+
+    def evaluate(self, t, out=None):
+        # Fields at time t. Without `out` they are views of the workspace
+        # buffers, overwritten by the next call; otherwise they are copied
+        # into `out`, a Fields of grid-shaped arrays (e.g. frames of a stack).
+        psi_i, dpsi_i_dt, psi_e, dpsi_e_dt = self.psi_i, self.dpsi_i_dt, self.psi_e, self.dpsi_e_dt
+        self._evaluate_bank(self._intrinsic, t, psi_i, dpsi_i_dt)
+        self._evaluate_bank(self._extrinsic, t, psi_e, dpsi_e_dt)
+
+        psi_r = self.psi_r
+        np.multiply(psi_i, psi_e, out=psi_r)
+        psi_r += psi_i
+        psi_r += psi_e
+        np.square(psi_r, out=self.E_exp)
+
+        # The intrinsic sine buffer is free again and serves as scratch
+        scratch = self._intrinsic['sines'][0]
+        E_per = self.E_per
+        np.multiply(dpsi_i_dt, psi_e, out=E_per)
+        np.multiply(dpsi_e_dt, psi_i, out=scratch)
+        E_per += scratch
+        E_per += dpsi_i_dt
+        E_per += dpsi_e_dt
+        np.abs(E_per, out=E_per)
+
+        fields = Fields(*(a.reshape(self.grid) for a in (psi_i, psi_e, psi_r, self.E_exp, E_per)))
+        if out is None:
+            return fields
+        for dst, src in zip(out, fields):
+            np.copyto(dst, src, casting='same_kind')
+        return out
+
+
+def evaluate_frames(X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi=0.0, dtype=np.float64):
+    # compute_fields through a Workspace: frame by frame into preallocated
+    # (T,) + grid stacks of the given dtype, with no per-frame temporaries
+    ws = Workspace(X, Y, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi, dtype=dtype)
+    T_seq = np.atleast_1d(np.asarray(T_seq, dtype=float))
+    stacks = Fields(*(np.empty((T_seq.size,) + ws.grid, ws.dtype) for _ in Fields._fields))
+    for n, t in enumerate(T_seq):
+        ws.evaluate(t, out=Fields(*(stack[n] for stack in stacks)))
+    return stacks
+
+
+def compute_waves(X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi=0.0, stepping='direct'):
+    # Intrinsic and summed external waves with their time derivatives.
+    # stepping='rotate' advances evenly spaced frames by phase rotation
+    # instead of evaluating sin/cos for every frame.
+    if stepping == 'rotate':
+        psi_i, dpsi_i_dt = rotating_wave_bank_sum(X, Y, T_seq, A_i, k_i, l_i, omega_i)
+        psi_e, dpsi_e_dt = rotating_wave_bank_sum(X, Y, T_seq, A_e, k_e, l_e, omega_e, phi)
+    elif stepping == 'direct':
+        psi_i, dpsi_i_dt = wave(X, Y, T_seq, A_i, k_i, l_i, omega_i)
+        psi_e, dpsi_e_dt = wave_bank_sum(X, Y, T_seq, A_e, k_e, l_e, omega_e, phi)
+    else:
+        raise ValueError(f"Unknown stepping mode {stepping!r}")
+    return psi_i, dpsi_i_dt, psi_e, dpsi_e_dt
+
+
+def compute_fields(X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi=0.0, stepping='direct',
+                   dtype=None, backend=None):
+    # All frames of T_seq in one broadcast pass. X/Y are meshgrid arrays
+    # (Y=None for the 1D line apps); A_e, k_e, l_e, omega_e and phi may be
+    # (K,) arrays describing a bank of external waves, which are summed.
+    # Passing a dtype evaluates frame by frame through a Workspace instead,
+    # and a backend name runs a fused kernel from rtc_backends.
+    if backend not in (None, 'numpy'):
+        if stepping != 'direct' or dtype is not None:
+            raise ValueError("Compute backends only support stepping='direct' in float64")
+        from rtc_backends import get_backend
+        return get_backend(backend).fields(X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi)
+    if dtype is not None:
+        if stepping != 'direct':
+            raise ValueError("Workspace evaluation only supports stepping='direct'")
+        return evaluate_frames(X, Y, T_seq, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi, dtype)
+    psi_i, dpsi_i_dt, psi_e, dpsi_e_dt = compute_waves(X, Y, T_seq, A_i, k_i, l_i, omega_i,
+                                                       A_e, k_e, l_e, omega_e, phi, stepping)
+    psi_r, E_exp, E_per = resonance(psi_i, dpsi_i_dt, psi_e, dpsi_e_dt)
+    return Fields(psi_i, psi_e, psi_r, E_exp, E_per)
@@ -0,0 +1,129 @@
+import base64
+import json
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Validator-free figure building. A figure spec is a go.Figure's to_dict(),
+# so plotly validates the skeleton (trace structure, styling, layout) once;
+# each frame is then a plain dict sharing everything unchanged with the spec,
+# with only the updated dicts copied and arrays encoded straight from their
+# NumPy buffers. Frames are described by the delta chart's updates: lists of
+# (trace, 'dotted.attribute', value) and a {'dotted.key': value} layout.
+
+# Typed-array codes plotly.js reads, as plotly's to_dict() writes them
+_SHORT_TYPES = {'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2', 'int32': 'i4', 'uint32': 'u4',
+                'float32': 'f4', 'float64': 'f8'}
+# plotly.js has no 64-bit integers; in-range values are narrowed to these
+_NARROW_TYPES = {'int64': np.int32, 'uint64': np.uint32}
+
+
+def typed_array(value):
+    # What to_dict() stores for `value`: numeric arrays become base64 typed
+    # arrays encoded from the buffer in place, anything else is kept as is
+    # (and serialised as a list)
+    if not isinstance(value, np.ndarray) or value.size == 0:
+        return value
+    narrow = _NARROW_TYPES.get(value.dtype.name)
+    if narrow is not None:
+        limits = np.iinfo(narrow)
+        if value.min() < limits.min or value.max() > limits.max:
+            return value
+        value = value.astype(narrow)
+    code = _SHORT_TYPES.get(value.dtype.name)
+    if code is None:
+        return value
+    spec = {'dtype': code, 'bdata': base64.b64encode(np.ascontiguousarray(value)).decode('ascii')}
+    if value.ndim > 1:
+        spec['shape'] = str(value.shape)[1:-1]
+    return spec
+
+
+def figure_spec(fig):
+    # Validated dict form of a go.Figure (or figure dict), built once
+    if not isinstance(fig, go.Figure):
+        fig = go.Figure(fig)
+    return fig.to_dict()
+
+
+def _set(node, path, value):
+    # Copy of dict `node` with the dotted path set; only dicts on the path are copied
+    head, _, rest = path.partition('.')
+    node = dict(node)
+    node[head] = _set(node.get(head, {}), rest, value) if rest else value
+    return node
+
+
+def _frame_traces(spec, updates):
+    # Partial traces of an animation frame: each updated trace's type and
+    # the updated attributes, in trace order, with their indices
+    traces = {}
+    for trace, path, value in updates:
+        traces[trace] = _set(traces.get(trace, {'type': spec['data'][trace]['type']}), path, typed_array(value))
+    order = sorted(traces)
+    return [traces[trace] for trace in order], order
+
+
+def build_figure(spec, updates=(), layout=None, frames=None):
+    # Figure dict for one frame of `spec`. `frames`, a list of update lists,
+    # adds browser animation frames named 0, 1, ... (see add_frame_animation)
+    # Every trace dict is the frame's own (pio.to_json pops their uids)
+    data = [dict(trace) for trace in spec['data']]
+    for trace, path, value in updates:
+        data[trace] = _set(data[trace], path, typed_array(value))
+    figure = {'data': data, 'layout': spec['layout']}
+    for path, value in (layout or {}).items():
+        figure['layout'] = _set(figure['layout'], path, value)
+    if frames is not None:
+        figure['frames'] = []
+        for n, frame_updates in enumerate(frames):
+            traces, order = _frame_traces(spec, frame_updates)
+            figure['frames'].append({'data': traces, 'name': str(n), 'traces': order})
+    return PrebuiltFigure(figure)
+
+
+class PrebuiltFigure(go.Figure):
+    # A built figure dict as a go.Figure with validation deferred:
+    # st.plotly_chart and pio.to_json take a go.Figure as already validated
+    # and only call to_dict(), which returns the dict as built (a plain dict
+    # would be validated all over again, seconds for an animation). The
+    # first use of any other go.Figure API (.layout, .data,
+    # update_layout, ...) validates the dict into a full figure
+
+    def __init__(self, figure):
+        # Set directly: BaseFigure.__setattr__ probes the attribute first
+        self.__dict__['_prebuilt'] = figure
+
+    def _materialise(self):
+        figure = self.__dict__.pop('_prebuilt')
+        go.Figure.__init__(self, figure)
+
+    def __getattr__(self, name):
+        # Reached only for attributes the unvalidated figure lacks
+        if name.startswith('__') or '_prebuilt' not in self.__dict__:
+            raise AttributeError(name)
+        self._materialise()
+        return getattr(self, name)
+
+    def to_dict(self):
+        if '_prebuilt' in self.__dict__:
+            return self.__dict__['_prebuilt']
+        return super().to_dict()
+
+    def to_plotly_json(self):
+        # BaseFigure.__repr__ edits this dict's layout, which the prebuilt
+        # dict shares with its spec
+        if '_prebuilt' in self.__dict__:
+            figure = self.__dict__['_prebuilt']
+            return dict(figure, layout=dict(figure['layout']))
+        return super().to_plotly_json()
+
+
+def same_json(reference, built):
+    # Whether a go.Figure and a built figure serialise to equal JSON
+    return json.loads(pio.to_json(reference, validate=False)) == json.loads(pio.to_json(built, validate=False))
+
+
+def payload_bytes(fig):
+    # Size of the JSON st.plotly_chart sends for `fig`
+    return len(pio.to_json(fig, validate=False).encode())
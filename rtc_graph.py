@@ -0,0 +1,206 @@
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from rtc_cache import FrameCache, param_key
+from rtc_engine import WAVE_PARAMS, Fields, bank_params, bank_spatial, resonance_terms, wave_phase, _bank_phases
+from rtc_service import ComputeService, compute_service
+
+# Incremental recompute of the field pipeline. A Graph holds named nodes,
+# each a function of named inputs (grid, times, slider values) and of other
+# nodes, whose values live in a compute service under a key hashed from the
+# node's name and its dependencies' keys: a node reruns when one of its
+# inputs changed value or a node it depends on did. Dragging phi then redoes
+# the extrinsic phase and what follows it but not psi_i, and A_e only
+# rescales the external waves' stored sines. Node values are shared between
+# sessions in their own byte budget, so the frames and figures in the frame
+# cache cannot evict them; a session keeps only the current run's references.
+#
+#   python rtc_graph.py   # nodes each parameter recomputes, checked against compute_fields
+
+# Holds the stored nodes of the default 300² x 40 grid (two phase and two
+# wave nodes of 2 x 27.5 MiB each) plus one recomputed branch
+GRAPH_CACHE_BYTES = int(os.environ.get('RTC_GRAPH_BYTES', 384 * 2**20))
+
+# Shared by every session's graph in this server process
+graph_service = ComputeService(FrameCache(GRAPH_CACHE_BYTES))
+
+
+class Graph:
+
+    def __init__(self, name='graph', service=graph_service, shared=compute_service):
+        # `name` scopes the node keys, so two graphs may define a node differently.
+        # Nodes live in `service`; those added with a key= in `shared`
+        self.name = name
+        self.service = service
+        self.shared = shared
+        self._nodes = {}
+        self._inputs = {}
+        self._keys = {}
+        self._values = {}
+        # Nodes recomputed since the last set_inputs, in evaluation order
+        self.recomputed = []
+
+    def add(self, name, fn, *deps, key=None):
+        # Define (or redefine) node `name` as fn(*deps); everything fn reads
+        # must be listed in deps. key=(kind, *input names) stores the value
+        # as cached(kind, ..., *inputs) would, to share it with that path
+        self._nodes[name] = (fn, deps, key)
+
+    def set_inputs(self, **inputs):
+        # Input values for the following evaluations, e.g. one script run
+        self._inputs = inputs
+        self._keys = {}
+        self._values = {}
+        self.recomputed = []
+
+    def _key(self, name):
+        # Cache key of a node's value, or hash of an input's value
+        if name not in self._keys:
+            if name in self._nodes:
+                _, deps, key = self._nodes[name]
+                if key is None:
+                    self._keys[name] = param_key('graph', self.name, name, *(self._key(dep) for dep in deps))
+                else:
+                    self._keys[name] = param_key(key[0], *(self._input(dep) for dep in key[1:]))
+            else:
+                self._keys[name] = param_key(self._input(name))
+        return self._keys[name]
+
+    def _input(self, name):
+        if name not in self._inputs:
+            raise KeyError(f"Graph input {name!r} is not set")
+        return self._inputs[name]
+
+    def evaluate(self, name):
+        # Value of node `name`: this run's, the cache's, or computed from its
+        # dependencies (evaluated the same way) on a miss
+        if name not in self._values:
+            fn, deps, key = self._nodes[name]
+            computed = []
+
+            def compute():
+                value = fn(*(self.evaluate(dep) if dep in self._nodes else self._input(dep) for dep in deps))
+                self.recomputed.append(name)
+                computed.append(name)
+                return value
+
+            self._values[name] = (self.service if key is None else self.shared).get(self._key(name), compute)
+            if not computed:
+                self._touch(deps)
+        return self._values[name]
+
+    def _touch(self, deps):
+        # A hit uses its dependencies' values too: keep them ahead of stale
+        # generations in the LRU, or an unchanged branch would be evicted
+        # first and recomputed on the next change that needs it
+        for dep in deps:
+            if dep in self._nodes and dep not in self._values:
+                _, deps_of, key = self._nodes[dep]
+                (self.service if key is None else self.shared).cache.touch(self._key(dep))
+                self._touch(deps_of)
+
+
+# Nodes of the field pipeline. Waves are (psi, ∂psi/∂t) pairs shaped (T,) + grid
+
+def intrinsic_phase(X, Y, T_seq, k_i, l_i, omega_i):
+    # sin and cos of the intrinsic wave's phase
+    phase = wave_phase(X, Y, T_seq, k_i, l_i, omega_i)
+    return np.sin(phase), np.cos(phase)
+
+
+def extrinsic_phase(X, Y, T_seq, k_e, l_e, omega_e, phi):
+    # sin and cos of every external wave's phase, shaped (T, K) + grid
+    _, k, l, omega, phi = bank_params(1.0, k_e, l_e, omega_e, phi)
+    spatial = bank_spatial(X, Y, k, l, phi)
+    T_seq = np.atleast_1d(np.asarray(T_seq, dtype=float))
+    cosines = np.empty((T_seq.size,) + spatial.shape)
+    sines = np.empty_like(cosines)
+    _bank_phases(spatial, omega, T_seq, cosines, sines)
+    shape = (T_seq.size, k.size) + np.shape(X)
+    return sines.reshape(shape), cosines.reshape(shape)
+
+
+def intrinsic_wave(phase, A_i, omega_i):
+    sines, cosines = phase
+    return A_i * sines, (-A_i * omega_i) * cosines
+
+
+def extrinsic_wave(phase, A_e, omega_e):
+    # The external waves summed with their amplitudes: one matrix product each
+    sines, cosines = phase
+    frames, waves = sines.shape[:2]
+    A, omega = (np.broadcast_to(np.asarray(p, dtype=float), (waves,)) for p in (A_e, omega_e))
+    psi = np.matmul(A, sines.reshape(frames, waves, -1))
+    dpsi_dt = np.matmul(-A * omega, cosines.reshape(frames, waves, -1))
+    return psi.reshape((frames,) + sines.shape[2:]), dpsi_dt.reshape((frames,) + sines.shape[2:])
+
+
+def fields(psi_i, psi_e):
+    # The resonance and its energies are a few elementwise passes, cheaper
+    # to redo than to store apart from the Fields that already hold psi_r:
+    # E_exp = psi_r² and E_per = |∂psi_r/∂t|
+    psi_r, dpsi_r_dt = resonance_terms(psi_i[0], psi_i[1], psi_e[0], psi_e[1])
+    return Fields(psi_i[0], psi_e[0], psi_r, psi_r ** 2, np.abs(dpsi_r_dt))
+
+
+def field_graph(name='fields', **services):
+    # compute_fields as a graph over the inputs X, Y, T_seq and WAVE_PARAMS;
+    # 'fields' shares its cache entry with cached('fields', ...) over the same inputs
+    graph = Graph(name, **services)
+    graph.add('intrinsic_phase', intrinsic_phase, 'X', 'Y', 'T_seq', 'k_i', 'l_i', 'omega_i')
+    graph.add('extrinsic_phase', extrinsic_phase, 'X', 'Y', 'T_seq', 'k_e', 'l_e', 'omega_e', 'phi')
+    graph.add('psi_i', intrinsic_wave, 'intrinsic_phase', 'A_i', 'omega_i')
+    graph.add('psi_e', extrinsic_wave, 'extrinsic_phase', 'A_e', 'omega_e')
+    graph.add('fields', fields, 'psi_i', 'psi_e', key=('fields', 'X', 'Y', 'T_seq') + WAVE_PARAMS)
+    return graph
+
+
+def session_graph(app, build=field_graph):
+    # One graph per app and Streamlit session, named after the app
+    import streamlit as st
+    key = f'graph_{app}'
+    if key not in st.session_state:
+        st.session_state[key] = build(app)
+    return st.session_state[key]
+
+
+def main(argv=None):
+    from rtc_engine import compute_fields
+    parser = argparse.ArgumentParser(description="Nodes each wave parameter recomputes, and the time saved")
+    parser.add_argument('--grid', type=int, default=300, help="grid points per axis")
+    parser.add_argument('--frames', type=int, default=40)
+    parser.add_argument('--cache-mib', type=int, help="graph node budget (default: RTC_GRAPH_BYTES or 384 MiB); "
+                                                      "nodes evicted from it are recomputed")
+    args = parser.parse_args(argv)
+    cache = graph_service.cache
+    if args.cache_mib:
+        cache.resize(args.cache_mib * 2**20)
+
+    x = np.linspace(-np.pi, np.pi, args.grid)
+    X, Y = np.meshgrid(x, x)
+    T_seq = np.linspace(0, 2 * np.pi, args.frames)
+    params = dict(zip(WAVE_PARAMS, (1.0, 2.0, 1.5, 3.0, 0.8, 2.5, 1.8, 2.7, np.pi / 4)))
+    graph = field_graph()
+    graph.set_inputs(X=X, Y=Y, T_seq=T_seq, **params)
+    start = time.perf_counter()
+    graph.evaluate('fields')
+    full = time.perf_counter() - start
+    print(f"all nodes: {full * 1000:.0f} ms, cache holds {cache.bytes / 2**20:.0f} of {cache.max_bytes / 2**20:.0f} MiB")
+    passed = True
+    for name in WAVE_PARAMS:
+        params[name] += 0.1
+        graph.set_inputs(X=X, Y=Y, T_seq=T_seq, **params)
+        start = time.perf_counter()
+        result = graph.evaluate('fields')
+        elapsed = time.perf_counter() - start
+        expected = compute_fields(X, Y, T_seq, *(params[p] for p in WAVE_PARAMS))
+        same = all(np.allclose(a, b, rtol=1e-12, atol=1e-12) for a, b in zip(result, expected))
+        passed = passed and same
+        print(f"{name:<8} {elapsed * 1000:>7.0f} ms  {'ok' if same else 'MISMATCH'}  {', '.join(graph.recomputed)}")
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import numpy as np
+import plotly.graph_objects as go
+from rtc_cache import param_key
+from rtc_engine import WaveBank
+
+# Stages of the experience/perception line view (rtc_simulation_lines3.py),
+# importable without starting Streamlit
+
+# Sample counts offered in the sidebar
+GRID_SIZES = (500, 1000, 2000, 5000, 10000, 20000)
+# Prior seconds per sample per drawn line per frame
+POINT_COST = 1e-6
+
+
+# External wave bank parameters for K waves, spread evenly as in the app
+def external_bank(num_external_waves):
+    return (np.linspace(0.5, 1.0, num_external_waves),
+            np.linspace(1.5, 3.0, num_external_waves),
+            np.linspace(2.0, 4.0, num_external_waves),
+            np.linspace(0, np.pi, num_external_waves))
+
+
+# One WaveBank per app and session, rebuilt when the samples or the waves change
+def session_wave_bank(app, x, A_e_arr, k_e_arr, omega_e_arr, phi_e_arr):
+    import streamlit as st
+    key = f'wave_bank_{app}'
+    params = param_key(x, A_e_arr, k_e_arr, omega_e_arr, phi_e_arr)
+    if st.session_state.get(key, (None,))[0] != params:
+        st.session_state[key] = (params, WaveBank(x, None, A_e_arr, k_e_arr, 0.0, omega_e_arr, phi_e_arr))
+    return st.session_state[key][1]
+
+
+# Waveforms for frame n at time t: the sums come from the cached fields, the
+# individual external waves from one frame of the bank (overwritten next frame)
+def compute_waveforms(n, t, fields, bank):
+    return fields.psi_i[n], bank.evaluate(t), fields.E_exp[n], fields.E_per[n]
+
+
+# All external waves as one line, separated by NaN gaps, so trace count stays fixed as K grows
+def external_lines(x, ext_waves):
+    gap = np.full((ext_waves.shape[0], 1), np.nan)
+    ext_x = np.concatenate([np.broadcast_to(x, ext_waves.shape), gap], axis=1).ravel()
+    ext_y = np.concatenate([ext_waves, gap], axis=1).ravel()
+    return ext_x, ext_y
+
+
+def plot_experience(x, t, psi_i, ext_waves, E_exp):
+    num_external_waves = ext_waves.shape[0]
+    fig_exp = go.Figure()
+    fig_exp.add_trace(go.Scatter(x=x, y=psi_i, mode='lines', name='Intrinsic Wave', line=dict(color='cyan', dash='dash')))
+    ext_x, ext_y = external_lines(x, ext_waves)
+    fig_exp.add_trace(go.Scatter(x=ext_x, y=ext_y, mode='lines', name=f'External Waves ({num_external_waves})', line=dict(color='magenta', dash='dot'), opacity=0.5))
+    fig_exp.add_trace(go.Scatter(x=x, y=E_exp, mode='lines', name='Resonance Wave', line=dict(color='blue')))
+    fig_exp.update_layout(title=f'Experience Waves at t={t:.2f}', yaxis=dict(range=[min(np.min(E_exp), np.min(psi_i)) * 1.2, np.max(E_exp) * 1.2]))
+    return fig_exp
+
+
+def plot_perception(x, t, E_per):
+    fig_per = go.Figure()
+    fig_per.add_trace(go.Scatter(x=x, y=E_per, mode='lines', name='Perception Wavefunction', line=dict(color='orange')))
+    fig_per.update_layout(title=f'Perception Wavefunction at t={t:.2f}', yaxis=dict(range=[0, np.max(E_per) * 1.1]))
+    return fig_per
+
+
+# (updates, layout) taking a plot_experience figure to frame t, for the delta chart
+def experience_frame(x, t, psi_i, ext_waves, E_exp):
+    updates = [(0, 'y', psi_i), (1, 'y', external_lines(x, ext_waves)[1]), (2, 'y', E_exp)]
+    layout = {'title.text': f'Experience Waves at t={t:.2f}',
+              'yaxis.range': [min(np.min(E_exp), np.min(psi_i)) * 1.2, np.max(E_exp) * 1.2]}
+    return updates, layout
+
+
+# (updates, layout) taking a plot_perception figure to frame t
+def perception_frame(t, E_per):
+    return [(0, 'y', E_per)], {'title.text': f'Perception Wavefunction at t={t:.2f}',
+                               'yaxis.range': [0, np.max(E_per) * 1.1]}
@@ -0,0 +1,68 @@
+# Adaptive level of detail: while animating, the grid is decimated by the
+# smallest stride whose predicted per-frame cost fits the frame budget; paused
+# or static views always get the full grid. The cost model is seconds per
+# drawn point per frame, seeded with a prior measured on the app's own
+# animated runs and then smoothed over the session's measurements.
+
+# Decimation strides tried in order, finest first
+LOD_STRIDES = (1, 2, 3, 4, 6, 8, 12, 16)
+# Never decimate an axis below this many points
+MIN_AXIS_POINTS = 8
+# Weight of the newest measurement in the smoothed cost
+SMOOTHING = 0.5
+
+
+def decimated_size(n, stride):
+    # Points per axis after keeping every stride-th point of n (ends included)
+    return (n - 1) // stride + 1
+
+
+class AdaptiveLOD:
+
+    def __init__(self, point_cost, dims=2):
+        self.point_cost = point_cost
+        self.dims = dims
+        self.measured = False
+
+    def predict(self, size, weight=1):
+        # Seconds per frame for `size` points per axis
+        return size ** self.dims * weight * self.point_cost
+
+    def level(self, n, budget, animating, weight=1):
+        # (stride, points per axis) for a full grid of n points per axis
+        if not animating:
+            return 1, n
+        best = 1, n
+        for stride in LOD_STRIDES:
+            size = decimated_size(n, stride)
+            if size < MIN_AXIS_POINTS:
+                break
+            best = stride, size
+            if self.predict(size, weight) <= budget:
+                break
+        return best
+
+    def record(self, size, frames, seconds, weight=1):
+        # Fold one measured run of `frames` frames at `size` points per axis in
+        cost = seconds / (size ** self.dims * weight * max(frames, 1))
+        if self.measured:
+            cost = SMOOTHING * cost + (1 - SMOOTHING) * self.point_cost
+        self.point_cost = cost
+        self.measured = True
+
+
+def lod_label(stride, size, n, dims=2):
+    shape = '×'.join([str(size)] * dims)
+    full = '×'.join([str(n)] * dims)
+    if stride == 1:
+        return f"Level of detail: full ({full})"
+    return f"Level of detail: 1/{stride} ({shape} of {full})"
+
+
+def session_lod(app, point_cost, dims=2):
+    # One cost model per app and Streamlit session
+    import streamlit as st
+    key = f'lod_{app}'
+    if key not in st.session_state:
+        st.session_state[key] = AdaptiveLOD(point_cost, dims)
+    return st.session_state[key]
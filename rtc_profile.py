@@ -0,0 +1,122 @@
+import json
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+import numpy as np
+from rtc_service import compute_service
+
+# Per-stage timings of the apps' frame pipeline (field maths, colour mapping,
+# figure build, plotly_chart serialisation). A profiler lives in the
+# session state while the sidebar switch is on; otherwise every app gets
+# NULL_PROFILER, whose stages are a shared no-op context.
+#
+#   RTC_PROFILE_LOG=timings.jsonl streamlit run rtc_simulation.py
+
+# Frames kept for the live percentiles and the JSONL download
+PROFILE_WINDOW = 300
+PERCENTILES = (50, 90, 99)
+# Every profiled frame is also appended here when set
+LOG_PATH = os.environ.get('RTC_PROFILE_LOG')
+
+
+class StageProfiler:
+    enabled = True
+
+    def __init__(self, app, window=PROFILE_WINDOW, log_path=LOG_PATH):
+        self.app = app
+        self.log_path = log_path
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.records = deque(maxlen=window)
+        self._stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stages[name] = self._stages.get(name, 0.0) + time.perf_counter() - start
+
+    def frame(self, frames=1, **info):
+        # Close the current frame: `frames` is how many animation frames the
+        # stages produced (a client-side animation ships them all at once)
+        record = dict(app=self.app, time=time.time(), frames=frames,
+                      total=sum(self._stages.values()), stages=self._stages, **info)
+        for name, seconds in self._stages.items():
+            self.samples[name].append(seconds)
+        self.samples['total'].append(record['total'])
+        self.records.append(record)
+        self._stages = {}
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        return record
+
+    def percentiles(self):
+        # {stage: (p50, p90, p99) seconds} over the window
+        return {name: tuple(np.percentile(values, PERCENTILES)) for name, values in self.samples.items()}
+
+    def pipeline_fps(self):
+        # Frames the server pipeline produces per second of work
+        busy = sum(r['total'] for r in self.records)
+        return sum(r['frames'] for r in self.records) / busy if busy else 0.0
+
+    def observed_fps(self):
+        # Frames per wall-clock second between the first and last rerun
+        if len(self.records) < 2:
+            return None
+        first, last = self.records[0], self.records[-1]
+        elapsed = last['time'] - first['time']
+        return sum(r['frames'] for r in list(self.records)[1:]) / elapsed if elapsed > 0 else None
+
+    def jsonl(self):
+        return ''.join(json.dumps(r) + '\n' for r in self.records)
+
+
+class NullProfiler:
+    enabled = False
+
+    def stage(self, name):
+        return _NULL_STAGE
+
+    def frame(self, frames=1, **info):
+        return None
+
+
+_NULL_STAGE = nullcontext()
+NULL_PROFILER = NullProfiler()
+
+
+def sidebar_profiler(app):
+    # The session's profiler when "Show profiling" is ticked, else NULL_PROFILER
+    import streamlit as st
+    if not st.sidebar.checkbox("Show profiling", value=False, key='show_profiling'):
+        return NULL_PROFILER
+    key = f'profiler_{app}'
+    if key not in st.session_state:
+        st.session_state[key] = StageProfiler(app)
+    return st.session_state[key]
+
+
+def show_profile(profiler, target_fps):
+    # Sidebar panel with per-stage percentiles and FPS against the target
+    if not profiler.enabled:
+        return
+    import streamlit as st
+    with st.sidebar.expander("Profiling", expanded=True):
+        rows = ["| stage | " + " | ".join(f"p{p} ms" for p in PERCENTILES) + " |",
+                "|---|" + "---:|" * len(PERCENTILES)]
+        for name, values in profiler.percentiles().items():
+            rows.append(f"| {name} | " + " | ".join(f"{v * 1000:.1f}" for v in values) + " |")
+        st.markdown('\n'.join(rows))
+        observed = profiler.observed_fps()
+        st.caption(f"Pipeline {profiler.pipeline_fps():.1f} FPS"
+                   + (f", observed {observed:.1f} FPS" if observed is not None else "")
+                   + f", target {target_fps:.1f} FPS over {len(profiler.records)} frames")
+        shared = compute_service.stats()
+        st.caption(f"Shared compute: {shared['shared_rate']:.0%} of {shared['requests']} requests served without "
+                   f"recomputing ({shared['hits']} cached, {shared['deduplicated']} waited on another session, "
+                   f"{shared['computed']} computed)")
+        st.download_button("Download timings (JSONL)", profiler.jsonl(),
+                           file_name=f'{profiler.app}_timings.jsonl', mime='application/x-ndjson')
@@ -0,0 +1,287 @@
+import argparse
+import base64
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from rtc_engine import WAVE_PARAMS, compute_waves, resonance_terms
+from rtc_store import open_store
+
+# Headless batch renderer for the animations the R scripts produced with
+# saveGIF/saveHTML: same field equations as rtc_simulation.py, frames
+# rasterised to PNG in a process pool, then assembled to GIF, MP4 or HTML.
+# Modes: 'resonance' and 'dual' are persp surfaces over (X, Y); 'tunnel'
+# and 'dual_tunnel' are the scatter3D tunnels, each frame's field drawn at
+# its time t along the depth axis and coloured by its energy.
+#
+#   python rtc_render.py render_configs/holographic_resonance.json
+
+# Matches the R pipeline: 100x100 grid, 60 frames over one period, 800x600
+# frames at 0.1 s, persp view theta=45/phi=25 and zlim c(-3, 3)
+DEFAULT_CONFIG = dict(
+    A_i=1.0, A_e=0.8,
+    k_i=2.0, k_e=2.5,
+    l_i=1.5, l_e=1.8,
+    omega_i=3.0, omega_e=2.7,
+    phi=np.pi / 4,
+    grid=100,
+    frames=60,
+    t_end=2 * np.pi,
+    stepping='direct',
+    mode='resonance',
+    output='RTC_Holographic_Resonance.gif',
+    frames_dir=None,
+    frame_name='Rplot{n}.png',
+    interval=0.1,
+    width=800,
+    height=600,
+    dpi=100,
+    zlim=[-3, 3],
+    view_theta=45,
+    view_phi=25,
+    cmap='jet',
+    workers=None,
+    chunk=None,
+    store=None,
+)
+MODES = ('resonance', 'dual', 'tunnel', 'dual_tunnel')
+
+def load_config(path=None, **overrides):
+    # JSON or TOML file on top of DEFAULT_CONFIG, then explicit overrides
+    config = dict(DEFAULT_CONFIG)
+    if path:
+        if path.endswith('.toml'):
+            import tomllib
+            with open(path, 'rb') as f:
+                config.update(tomllib.load(f))
+        else:
+            with open(path) as f:
+                config.update(json.load(f))
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown render config keys: {', '.join(sorted(unknown))}")
+    if config['mode'] not in MODES:
+        raise ValueError(f"Unknown render mode {config['mode']!r}")
+    return config
+
+
+def frame_panels(config, t, psi_r, dpsi_r_dt):
+    # (title, panels) for one frame; each panel is (Z, panel title, axis
+    # labels, C): a surface over (X, Y) when C is None, else a tunnel
+    # scatter of (X, t, Z) coloured by C
+    mode = config['mode']
+    if mode == 'dual':
+        return (f"Dynamic Holographic Mind Field — t = {t:.2f}",
+                [(psi_r, "Integral Resonance Field (ψᵣ)", ("X", "Y", "Amplitude"), None),
+                 (dpsi_r_dt, "Perceptual Collapse (∂ψᵣ/∂t)", ("X", "Y", "Amplitude Change"), None)])
+    if mode == 'tunnel':
+        return (f"Evolving Mind-Energy Field — t = {t:.2f}",
+                [(psi_r, "4D Holographic Tunnel of Consciousness (ψᵣ(x, y, t))",
+                  ("X (spatial)", "Time (t)", "Resonant Amplitude ψᵣ"), psi_r ** 2)])
+    if mode == 'dual_tunnel':
+        return (f"Dual 4D Holographic Consciousness — t = {t:.2f}",
+                [(psi_r, "Experience Tunnel (ψᵣ)", ("X", "Time (t)", "ψᵣ"), psi_r ** 2),
+                 (dpsi_r_dt, "Perception Tunnel (∂ψᵣ/∂t)", ("X", "Time (t)", "∂ψᵣ/∂t"), np.abs(dpsi_r_dt))])
+    return (None,
+            [(psi_r, f"Dynamic Holographic Resonance Field (ψ_r),  t = {t:.2f}",
+              ("X (spatial dimension)", "Y (spatial dimension)", "Resonant Amplitude"), None)])
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def render_frame(path, X, Y, t, title, panels, style):
+    # Rasterise one frame to PNG; runs in a worker process
+    import matplotlib.pyplot as plt
+    fig = plt.figure(figsize=(style['width'] / style['dpi'], style['height'] / style['dpi']), dpi=style['dpi'])
+    for i, (Z, panel_title, (xlabel, ylabel, zlabel), C) in enumerate(panels):
+        ax = fig.add_subplot(1, len(panels), i + 1, projection='3d')
+        if C is None:
+            ax.plot_surface(X, Y, Z, cmap=style['cmap'], rcount=Z.shape[0], ccount=Z.shape[1],
+                            edgecolor=(0, 0, 0, 0.25), linewidth=0.1)
+            ax.set_zlim(*style['zlim'])
+        else:
+            # scatter3D(pch=20, cex=0.5, clim=c(0, max(E))): z autoscales,
+            # the time axis spans the whole run so the slice moves along it
+            points = ax.scatter(X.ravel(), np.full(X.size, t), Z.ravel(), c=C.ravel(), cmap=style['cmap'],
+                                vmin=0, vmax=C.max(), s=2, depthshade=False)
+            ax.set_ylim(0, style['t_end'])
+            fig.colorbar(points, ax=ax, shrink=0.5, pad=0.15)
+        # R persp theta is measured from the -y axis, matplotlib azim from +x
+        ax.view_init(elev=style['view_phi'], azim=style['view_theta'] - 90)
+        ax.set_title(panel_title, fontsize=10)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_zlabel(zlabel)
+    if title:
+        fig.suptitle(title)
+    fig.savefig(path, dpi=style['dpi'])
+    plt.close(fig)
+    return path
+
+
+def render_frames(config, frames_dir):
+    # Compute the field a chunk of frames at a time and hand each frame to
+    # the pool as soon as it exists, so maths and rasterisation overlap
+    workers = config['workers'] or os.cpu_count() or 1
+    chunk = config['chunk'] or 2 * workers
+    x = np.linspace(-np.pi, np.pi, config['grid'])
+    X, Y = np.meshgrid(x, x)
+    T_seq = np.linspace(0, config['t_end'], config['frames'])
+    params = [config[name] for name in WAVE_PARAMS]
+    style = {k: config[k] for k in ('width', 'height', 'dpi', 'zlim', 'view_theta', 'view_phi', 'cmap', 't_end')}
+
+    # With a frame store, frames computed by earlier runs are paged back in
+    store = open_store(config['store'], config, fields=('psi_r', 'dpsi_r_dt')) if config['store'] else None
+
+    futures = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for start in range(0, T_seq.size, chunk):
+            T = T_seq[start:start + chunk]
+            if store is not None:
+                store.fill(start, start + T.size)
+                psi_r = store.window('psi_r', start, start + T.size)
+                dpsi_r_dt = store.window('dpsi_r_dt', start, start + T.size)
+            else:
+                psi_r, dpsi_r_dt = resonance_terms(*compute_waves(X, Y, T, *params, stepping=config['stepping']))
+            for j, t in enumerate(T):
+                path = os.path.join(frames_dir, config['frame_name'].format(n=start + j + 1))
+                title, panels = frame_panels(config, t, psi_r[j], dpsi_r_dt[j])
+                futures.append(pool.submit(render_frame, path, X, Y, t, title, panels, style))
+        return [f.result() for f in futures]
+
+
+def write_gif(paths, output, interval):
+    from PIL import Image
+    images = [Image.open(p).convert('RGB') for p in paths]
+    images[0].save(output, save_all=True, append_images=images[1:],
+                   duration=int(round(interval * 1000)), loop=0)
+
+
+def write_mp4(frames_dir, frame_name, output, interval):
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError("MP4 output needs ffmpeg on the PATH")
+    subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-framerate', str(1 / interval), '-start_number', '1',
+                    '-i', os.path.join(frames_dir, frame_name.format(n='%d')),
+                    '-pix_fmt', 'yuv420p', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', output], check=True)
+
+
+HTML_PLAYER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; text-align: center; background: #fff; }}
+#controls {{ margin: 8px; }}
+#frame {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+<img id="frame" alt="{title}">
+<div id="controls">
+<button id="play">Play</button>
+<select id="speed">
+<option value="0.5">0.5×</option><option value="1" selected>1×</option>
+<option value="2">2×</option><option value="4">4×</option>
+</select>
+<input id="seek" type="range" min="0" max="{last}" value="0" style="width: 60%">
+<span id="label">1 / {count}</span>
+</div>
+<script>
+var frames = {frames};
+var interval = {interval_ms};
+var img = document.getElementById('frame'), seek = document.getElementById('seek');
+var label = document.getElementById('label'), play = document.getElementById('play');
+var speed = document.getElementById('speed'), index = 0, timer = null;
+function show(i) {{
+  index = (i + frames.length) % frames.length;
+  img.src = 'data:image/png;base64,' + frames[index];
+  seek.value = index;
+  label.textContent = (index + 1) + ' / ' + frames.length;
+}}
+function start() {{
+  stop();
+  timer = setInterval(function () {{ show(index + 1); }}, interval / parseFloat(speed.value));
+  play.textContent = 'Pause';
+}}
+function stop() {{
+  if (timer) clearInterval(timer);
+  timer = null;
+  play.textContent = 'Play';
+}}
+play.onclick = function () {{ timer ? stop() : start(); }};
+speed.onchange = function () {{ if (timer) start(); }};
+seek.oninput = function () {{ stop(); show(parseInt(seek.value)); }};
+show(0);
+start();
+</script>
+</body>
+</html>
+"""
+
+
+def write_html(paths, output, interval, title):
+    # Self-contained player: frames are embedded, no js/ or images/ needed
+    frames = []
+    for p in paths:
+        with open(p, 'rb') as f:
+            frames.append(base64.b64encode(f.read()).decode('ascii'))
+    with open(output, 'w') as f:
+        f.write(HTML_PLAYER.format(title=title, frames=json.dumps(frames), interval_ms=interval * 1000,
+                                   last=len(frames) - 1, count=len(frames)))
+
+
+def render(config):
+    frames_dir = config['frames_dir']
+    scratch = None
+    if frames_dir is None:
+        frames_dir = scratch = tempfile.mkdtemp(prefix='rtc_frames_')
+    os.makedirs(frames_dir, exist_ok=True)
+    try:
+        paths = render_frames(config, frames_dir)
+        output = config['output']
+        if output:
+            ext = os.path.splitext(output)[1].lower()
+            if ext == '.gif':
+                write_gif(paths, output, config['interval'])
+            elif ext == '.mp4':
+                write_mp4(frames_dir, config['frame_name'], output, config['interval'])
+            elif ext in ('.html', '.htm'):
+                title = os.path.splitext(os.path.basename(output))[0].replace('_', ' ')
+                write_html(paths, output, config['interval'], title)
+            else:
+                raise ValueError(f"Unsupported output format {ext!r}")
+        return paths
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render RTC resonance animations to GIF, MP4 or HTML")
+    parser.add_argument('config', nargs='?', help="JSON or TOML render config")
+    parser.add_argument('-o', '--output', help="output file (.gif, .mp4 or .html)")
+    parser.add_argument('--frames-dir', help="keep the PNG frames in this directory")
+    parser.add_argument('-j', '--workers', type=int, help="rasteriser processes (default: all cores)")
+    parser.add_argument('--store', help="page frames from (and save them to) a frame store directory")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config, output=args.output, frames_dir=args.frames_dir, workers=args.workers,
+                         store=args.store)
+    start = time.perf_counter()
+    paths = render(config)
+    print(f"Rendered {len(paths)} frames to {config['output'] or config['frames_dir']} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import Future
+from rtc_cache import frame_cache, param_key
+
+# Process-wide compute service in front of the shared FrameCache. Every
+# Streamlit session runs its script in its own thread; when several ask for
+# the same parameters at once, the first computes and the others wait on its
+# future instead of repeating the work. Results are stored read-only in the
+# cache, so every session shares the same arrays.
+
+
+class ComputeService:
+
+    def __init__(self, cache=frame_cache):
+        self.cache = cache
+        self.requests = 0
+        self.hits = 0
+        self.computed = 0
+        self.deduplicated = 0
+        self.failed = 0
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compute):
+        with self._lock:
+            self.requests += 1
+            value = self.cache.get(key, _MISSING)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.deduplicated += 1
+        if not owner:
+            # Another session is computing this key; its result (or error) is ours
+            return future.result()
+
+        try:
+            value = self.cache.put(key, compute())
+        except BaseException as exc:
+            future.set_exception(exc)
+            with self._lock:
+                self.failed += 1
+                del self._inflight[key]
+            raise
+        with self._lock:
+            self.computed += 1
+            del self._inflight[key]
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            misses = self.computed + self.deduplicated
+            return dict(requests=self.requests, hits=self.hits, computed=self.computed,
+                        deduplicated=self.deduplicated, failed=self.failed, inflight=len(self._inflight),
+                        dedup_rate=self.deduplicated / misses if misses else 0.0,
+                        shared_rate=(self.hits + self.deduplicated) / self.requests if self.requests else 0.0)
+
+
+_MISSING = object()
+
+# Shared by every Streamlit session in this server process
+compute_service = ComputeService()
+
+
+def cached(kind, compute, *parts, **params):
+    # `kind` for these parameters: from the cache, from a session already
+    # computing it, or computed here on a miss
+    return compute_service.get(param_key(kind, *parts, **params), compute)
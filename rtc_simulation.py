@@ -1,9 +1,19 @@
 import streamlit as st
-import numpy as np
-import pandas as pd
-import plotly.graph_objects as go
-from matplotlib import cm
 import time
+import numpy as np
+from rtc_engine import WAVE_PARAMS, compute_fields
+from rtc_cache import param_key
+from rtc_service import cached
+from rtc_graph import session_graph
+from rtc_backends import DEFAULT_BACKEND
+from rtc_tubes import (GRID_SIZES, POINT_COST, LAYOUT, PLANE_LAYOUT, RENDER_MODES, n_colors, frame_colors,
+                       create_figure, frame_updates, animated_figure, delta_skeleton, delta_frame, grid_figure,
+                       grid_updates, grid_ranges, grid_animated_figure)
+from rtc_figure import figure_spec, build_figure, payload_bytes
+from rtc_delta import delta_chart
+from rtc_sweep import METRICS, SWEEP_RANGES, sweep, heatmap_figure
+from rtc_lod import session_lod, lod_label
+from rtc_profile import sidebar_profiler, show_profile
 
 st.title("Animated Interactive Dual Holographic Energy Tubes")
 
@@ -18,14 +28,27 @@ omega_i = st.sidebar.slider("ω_i (Angular frequency intrinsic)", 0.1, 5.0, 3.0)
 omega_e = st.sidebar.slider("ω_e (Angular frequency extrinsic)", 0.1, 5.0, 2.7)
 phi = st.sidebar.slider("Phase shift φ (radians)", 0.0, 2*np.pi, np.pi / 4)
 
-# Spatial grid
-x = np.linspace(-np.pi, np.pi, 30)
-y = np.linspace(-np.pi, np.pi, 30)
-X, Y = np.meshgrid(x, y)
-
 # Animation control
 animate = st.sidebar.checkbox("Animate Wave", value=True)
 frame_delay = st.sidebar.slider("Animation speed (ms per frame)", 50, 1000, 200)
+# Markers send X, Y, Z and a colour per point; the grid modes send only Z
+# over 1D axes and leave the colour mapping to the browser
+render_mode = st.sidebar.selectbox("Render mode", RENDER_MODES)
+markers = render_mode == 'markers'
+client_colors = markers and st.sidebar.checkbox("Colour mapping in browser", value=False)
+grid_size = st.sidebar.select_slider("Grid resolution", GRID_SIZES, value=30)
+adaptive = st.sidebar.checkbox("Adaptive level of detail", value=True)
+delta = st.sidebar.checkbox("Delta updates (binary frames)", value=False)
+incremental = st.sidebar.checkbox("Incremental recompute", value=False)
+show_sweep = st.sidebar.checkbox("Parameter sweep heatmap", value=False)
+profiler = sidebar_profiler('tubes')
+
+# Spatial grid: while animating, decimated to fit the frame budget
+lod = session_lod('tubes', POINT_COST)
+stride, n = lod.level(grid_size, frame_delay / 1000, animate and adaptive)
+x = np.linspace(-np.pi, np.pi, n)
+y = np.linspace(-np.pi, np.pi, n)
+X, Y = np.meshgrid(x, y)
 
 # Prepare Plotly chart container
 plot_placeholder = st.empty()
@@ -34,65 +57,113 @@ plot_placeholder = st.empty()
 num_frames = 40
 T_seq = np.linspace(0, 2 * np.pi, num_frames)
 
-n_colors = 100
-viridis = cm.get_cmap('viridis', n_colors)
-plasma = cm.get_cmap('plasma', n_colors)
-
-def get_colors(Z, cmap):
-    Z_norm = (Z - Z.min()) / (Z.max() - Z.min())
-    return [f'rgb{tuple(int(c*255) for c in cmap(val)[:3])}' for val in Z_norm]
-
-def create_figure(t):
-    psi_i = A_i * np.sin(k_i * X + l_i * Y - omega_i * t)
-    psi_e = A_e * np.sin(k_e * X + l_e * Y - omega_e * t + phi)
-    psi_r = psi_i + psi_e + psi_i * psi_e
-    E_exp = psi_r ** 2
-    dpsi_r_dt = (-A_i * omega_i * np.cos(k_i * X + l_i * Y - omega_i * t)
-                 - A_e * omega_e * np.cos(k_e * X + l_e * Y - omega_e * t + phi)
-                 - (A_i * omega_i * np.cos(k_i * X + l_i * Y - omega_i * t) * psi_e +
-                    A_e * omega_e * np.cos(k_e * X + l_e * Y - omega_e * t + phi) * psi_i))
-    E_per = np.abs(dpsi_r_dt)
-
-    df_exp = pd.DataFrame({'X': X.ravel(), 'Y': Y.ravel(), 'Z': E_exp.ravel()})
-    df_per = pd.DataFrame({'X': X.ravel(), 'Y': Y.ravel(), 'Z': E_per.ravel()})
-
-    df_exp['color'] = get_colors(df_exp['Z'], viridis)
-    df_per['color'] = get_colors(df_per['Z'], plasma)
-
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter3d(
-        x=df_exp['X'], y=df_exp['Y'], z=df_exp['Z'],
-        mode='markers',
-        marker=dict(size=3, color=df_exp['color']),
-        name='Experience ψr²'
-    ))
-
-    fig.add_trace(go.Scatter3d(
-        x=df_per['X'], y=df_per['Y'], z=df_per['Z'],
-        mode='markers',
-        marker=dict(size=3, color=df_per['color']),
-        name='Perception |∂ψr/∂t|'
-    ))
-
-    fig.update_layout(
-        scene=dict(
-            xaxis_title='X (spatial)',
-            yaxis_title='Y (spatial)',
-            zaxis_title='Amplitude / Energy'
-        ),
-        height=700,
-        margin=dict(l=0, r=0, b=0, t=40)
-    )
-    return fig
-
-if animate:
-    for t in T_seq:  # Loop through time frames
-        fig = create_figure(t)
-        plot_placeholder.plotly_chart(fig, use_container_width=True)
-        time.sleep(frame_delay / 1000)
-else:
-    # Static plot at initial frame
-    fig = create_figure(T_seq[0])
-    plot_placeholder.plotly_chart(fig, use_container_width=True)
+# Every frame of the animation in one pass; the static plot only needs the first
+start = time.perf_counter()
+frame_times = T_seq if animate else T_seq[:1]
+wave_values = (A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi)
 
+
+def skeleton():
+    # Figure spec validated once per grid and mode and shared; frames are built on it as dicts
+    if markers:
+        build = lambda: figure_spec(create_figure(X, Y, fields.E_exp[0], fields.E_per[0], *colors[0]))
+        return cached('figure_spec', build, 'tubes', X, Y, client_colors)
+    build = lambda: figure_spec(grid_figure(render_mode, x, y, fields.E_exp[0], fields.E_per[0]))
+    return cached('figure_spec', build, 'tubes', render_mode, x, y)
+
+
+def make_figure(fields, colors=None):
+    if animate:
+        # All frames go to the browser once; playback runs client-side
+        if markers:
+            return animated_figure(X, Y, fields, colors, T_seq, frame_delay, skeleton())
+        return grid_animated_figure(render_mode, x, y, fields, T_seq, frame_delay, skeleton())
+    # Static plot at initial frame
+    if markers:
+        return build_figure(skeleton(), frame_updates(fields.E_exp[0], fields.E_per[0], *colors[0]))
+    E_exp, E_per = fields.E_exp[0], fields.E_per[0]
+    return build_figure(skeleton(), grid_updates(E_exp, E_per), grid_ranges(render_mode, E_exp, E_per))
+
+
+# Shared across sessions and reruns, keyed on the parameters, grid and times
+fields_args = (X, Y, frame_times) + wave_values
+if incremental:
+    # The session's dependency graph: a slider change recomputes only the
+    # nodes downstream of it, in NumPy, sharing its fields with the path below
+    graph = session_graph('tubes')
+    graph.set_inputs(X=X, Y=Y, T_seq=frame_times, **dict(zip(WAVE_PARAMS, wave_values)))
+    with profiler.stage('compute'):
+        fields = graph.evaluate('fields')
+    computed = 'fields' in graph.recomputed
+else:
+    computed = False
+
+    def compute():
+        global computed
+        computed = True
+        return compute_fields(*fields_args, backend=DEFAULT_BACKEND)
+
+    with profiler.stage('compute'):
+        fields = cached('fields', compute, *fields_args)
+if markers and not delta:
+    with profiler.stage('colors'):
+        colors = cached('colors', lambda: frame_colors(fields, client_colors), *fields_args, n_colors,
+                        client_colors)
+
+if delta:
+    # Skeleton once per session; reruns and frames send only Z (and colour indices)
+    with profiler.stage('figure'):
+        if markers:
+            frames = [delta_frame(E_exp, E_per) for E_exp, E_per in zip(fields.E_exp, fields.E_per)]
+            z_max = max(fields.E_exp.max(), fields.E_per.max())
+            layout = {'scene.zaxis.range': [0, z_max * 1.05]} if animate else {'scene.zaxis.autorange': True}
+            build = lambda: delta_skeleton(X, Y, fields.E_exp[0], fields.E_per[0])
+        else:
+            frames = [grid_updates(E_exp, E_per) for E_exp, E_per in zip(fields.E_exp, fields.E_per)]
+            layout = grid_ranges(render_mode, fields.E_exp, fields.E_per)
+            build = lambda: grid_figure(render_mode, x, y, fields.E_exp[0], fields.E_per[0])
+    with profiler.stage('plotly_chart'):
+        with plot_placeholder:
+            sent = delta_chart(build, param_key('tubes_skeleton', render_mode, X, Y), frames, layout=layout,
+                               interval=frame_delay if animate else 0,
+                               height=(LAYOUT if markers or render_mode == 'surface' else PLANE_LAYOUT)['height'],
+                               key='tubes_chart')
+    st.sidebar.caption(f"Delta payload: {sent['frame_bytes'] / 1024:.1f} KiB/frame"
+                       + (f", skeleton {sent['skeleton_bytes'] / 1024:.0f} KiB" if sent['skeleton_bytes'] else ""))
+else:
+    with profiler.stage('figure'):
+        fig = make_figure(fields, colors if markers else None)
+    with profiler.stage('plotly_chart'):
+        plot_placeholder.plotly_chart(fig, width='stretch')
+    # The whole figure is sent on every rerun; animations carry all their frames
+    st.sidebar.caption(f"{render_mode.capitalize()} payload: "
+                       f"{payload_bytes(fig) / frame_times.size / 1024:.1f} KiB/frame")
+if incremental:
+    st.sidebar.caption(f"Recomputed: {', '.join(graph.recomputed) or 'nothing'}")
+
+# Only runs that computed their frames measure the cost per point; a cache
+# hit would teach the model that the full grid is nearly free
+if computed:
+    lod.record(n, frame_times.size, time.perf_counter() - start)
+st.sidebar.caption(lod_label(stride, n, grid_size))
+profiler.frame(frames=frame_times.size, lod=stride)
+show_profile(profiler, 1000 / frame_delay)
+
+# A metric over two parameters, the others held at the slider values
+if show_sweep:
+    with st.expander("Parameter sweep", expanded=True):
+        col_y, col_x, col_metric, col_steps = st.columns(4)
+        y_name = col_y.selectbox("Y parameter", WAVE_PARAMS, index=WAVE_PARAMS.index('A_i'))
+        x_name = col_x.selectbox("X parameter", WAVE_PARAMS, index=WAVE_PARAMS.index('omega_i'))
+        metric = col_metric.selectbox("Metric", METRICS)
+        steps = col_steps.slider("Steps per axis", 5, 40, 15)
+        if x_name == y_name:
+            st.warning("Choose two different parameters to sweep")
+        else:
+            base = dict(zip(WAVE_PARAMS, (A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi)))
+            spec = {y_name: np.linspace(*SWEEP_RANGES[y_name], steps),
+                    x_name: np.linspace(*SWEEP_RANGES[x_name], steps)}
+            # In this process: a process pool forked from the threaded server, one
+            # worker per core on every uncached change, is for the CLI only
+            points, metrics = cached('sweep', lambda: sweep(spec, base, workers=1), y_name, x_name, spec, base)
+            st.plotly_chart(heatmap_figure(spec, points, metrics, metric), width='stretch')
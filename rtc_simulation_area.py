@@ -1,8 +1,16 @@
 import streamlit as st
-import numpy as np
-import plotly.graph_objects as go
-from matplotlib import cm
 import time
+import numpy as np
+from rtc_engine import compute_fields
+from rtc_cache import param_key
+from rtc_service import cached
+from rtc_backends import DEFAULT_BACKEND
+from rtc_area import (GRID_SIZES, POINT_COST, LAYOUT, cividis, cool, frame_colors, create_figure, frame_updates,
+                      animated_figure, delta_skeleton, delta_frame)
+from rtc_figure import figure_spec, build_figure
+from rtc_delta import delta_chart
+from rtc_lod import session_lod, lod_label
+from rtc_profile import sidebar_profiler, show_profile
 
 st.title("3D Line Plot with Filled Area Under Curves Workaround")
 
@@ -17,117 +25,81 @@ omega_i = st.sidebar.slider("ω_i (Angular frequency intrinsic)", 0.1, 5.0, 3.0)
 omega_e = st.sidebar.slider("ω_e (Angular frequency extrinsic)", 0.1, 5.0, 2.7)
 phi = st.sidebar.slider("Phase shift φ (radians)", 0.0, 2*np.pi, np.pi / 4)
 
-# Spatial resolution
-n_lines = 30
-x = np.linspace(-np.pi, np.pi, n_lines)
-y = np.linspace(-np.pi, np.pi, n_lines)
-
 # Animation controls
 animate = st.sidebar.checkbox("Animate Wave", value=True)
 frame_delay = st.sidebar.slider("Animation speed (ms per frame)", 50, 1000, 200)
+grid_size = st.sidebar.select_slider("Grid resolution (lines)", GRID_SIZES, value=30)
+adaptive = st.sidebar.checkbox("Adaptive level of detail", value=True)
+delta = st.sidebar.checkbox("Delta updates (binary frames)", value=False)
+
+# Spatial resolution: while animating, decimated to fit the frame budget
+lod = session_lod('area', POINT_COST)
+stride, n_lines = lod.level(grid_size, frame_delay / 1000, animate and adaptive)
+x = np.linspace(-np.pi, np.pi, n_lines)
+y = np.linspace(-np.pi, np.pi, n_lines)
 plot_placeholder = st.empty()
+profiler = sidebar_profiler('area')
 num_frames = 40
 T_seq = np.linspace(0, 2 * np.pi, num_frames)
 
-# Colormaps for distinction
-cividis = cm.get_cmap('cividis')
-cool = cm.get_cmap('cool')
-
-def compute_wave(t):
-    X, Y = np.meshgrid(x, y)
-    psi_i = A_i * np.sin(k_i * X + l_i * Y - omega_i * t)
-    psi_e = A_e * np.sin(k_e * X + l_e * Y - omega_e * t + phi)
-    psi_r = psi_i + psi_e + psi_i * psi_e
-    E_exp = psi_r ** 2
-    dpsi_r_dt = (-A_i * omega_i * np.cos(k_i * X + l_i * Y - omega_i * t)
-                 - A_e * omega_e * np.cos(k_e * X + l_e * Y - omega_e * t + phi)
-                 - (A_i * omega_i * np.cos(k_i * X + l_i * Y - omega_i * t) * psi_e +
-                    A_e * omega_e * np.cos(k_e * X + l_e * Y - omega_e * t + phi) * psi_i))
-    E_per = np.abs(dpsi_r_dt)
-    return X, Y, E_exp, E_per
-
-def map_colors_line(Z, cmap):
-    colors = []
-    for i in range(Z.shape[0]):
-        avg_val = np.mean(Z[i, :])
-        norm_val = (avg_val - np.min(Z)) / (np.max(Z) - np.min(Z))
-        rgb = tuple(int(c*255) for c in cmap(norm_val)[:3])
-        colors.append(f'rgb{rgb}')
-    return colors
-
-def make_filled_surface_lines_traces(X, Y, Z, colors, name, zbase=0):
-    traces = []
-    for i in range(X.shape[0]):
-        xi = X[i, :]
-        yi = Y[i, :]
-        zi = Z[i, :]
-        # Create vertices for mesh: line and base
-        xs = np.concatenate([xi, xi[::-1]])
-        ys = np.concatenate([yi, yi[::-1]])
-        zs = np.concatenate([zi, np.full_like(zi, zbase)])
-
-        traces.append(go.Mesh3d(
-            x=xs,
-            y=ys,
-            z=zs,
-            color=colors[i],
-            opacity=0.4,
-            name=name if i == 0 else None,
-            showscale=False,
-            alphahull=0,
-            flatshading=True,
-            hoverinfo='skip',
-            showlegend=(i == 0)
-        ))
-
-        traces.append(go.Scatter3d(
-            x=xi,
-            y=yi,
-            z=zi,
-            mode='lines',
-            line=dict(color=colors[i], width=4),
-            showlegend=False
-        ))
-    return traces
-
-if animate:
-    for t in T_seq:
-        X, Y, E_exp, E_per = compute_wave(t)
-        exp_colors = map_colors_line(E_exp, cividis)
-        per_colors = map_colors_line(E_per, cool)
-
-        fig = go.Figure()
-        fig.add_traces(make_filled_surface_lines_traces(X, Y, E_exp, exp_colors, 'Experience ψr²'))
-        fig.add_traces(make_filled_surface_lines_traces(X, Y, E_per, per_colors, 'Perception |∂ψr/∂t|'))
-
-        fig.update_layout(
-            scene=dict(
-                xaxis_title='X (spatial)',
-                yaxis_title='Y (spatial)',
-                zaxis_title='Amplitude / Energy'
-            ),
-            height=700,
-            margin=dict(l=0, r=0, b=0, t=30)
-        )
+# Every frame of the animation in one pass; the static plot only needs the first
+start = time.perf_counter()
+X, Y = np.meshgrid(x, y)
+frame_times = T_seq if animate else T_seq[:1]
+# Shared across sessions and reruns, keyed on the parameters, grid and times
+fields_args = (X, Y, frame_times, A_i, k_i, l_i, omega_i, A_e, k_e, l_e, omega_e, phi)
+computed = False
+
+
+def compute():
+    global computed
+    computed = True
+    return compute_fields(*fields_args, backend=DEFAULT_BACKEND)
+
+
+with profiler.stage('compute'):
+    fields = cached('fields', compute, *fields_args)
+if not delta:
+    with profiler.stage('colors'):
+        colors = cached('line_colors', lambda: frame_colors(fields), *fields_args, cividis, cool)
+
+
+def skeleton():
+    # Figure spec validated once per grid and shared; frames are built on it as dicts
+    build = lambda: figure_spec(create_figure(X, Y, fields.E_exp[0], fields.E_per[0], *colors[0]))
+    return cached('figure_spec', build, 'area', X, Y)
+
+
+if delta:
+    # Skeleton once per session; reruns and frames send only heights and colour indices
+    with profiler.stage('figure'):
+        frames = [delta_frame(E_exp, E_per) for E_exp, E_per in zip(fields.E_exp, fields.E_per)]
+        z_max = max(fields.E_exp.max(), fields.E_per.max())
+        z_layout = {'scene.zaxis.range': [0, z_max * 1.05]} if animate else {'scene.zaxis.autorange': True}
+    with profiler.stage('plotly_chart'):
+        with plot_placeholder:
+            sent = delta_chart(lambda: delta_skeleton(X, Y, fields.E_exp[0], fields.E_per[0]),
+                               param_key('area_skeleton', X, Y), frames, layout=z_layout,
+                               interval=frame_delay if animate else 0, height=LAYOUT['height'], key='area_chart')
+    st.sidebar.caption(f"Delta payload: {sent['frame_bytes'] / 1024:.1f} KiB/frame"
+                       + (f", skeleton {sent['skeleton_bytes'] / 1024:.0f} KiB" if sent['skeleton_bytes'] else ""))
+elif animate:
+    # All frames go to the browser once; playback runs client-side
+    with profiler.stage('figure'):
+        fig = animated_figure(X, Y, fields, colors, T_seq, frame_delay, skeleton())
+    with profiler.stage('plotly_chart'):
         plot_placeholder.plotly_chart(fig, width='stretch')
-        time.sleep(frame_delay / 1000)
 else:
-    X, Y, E_exp, E_per = compute_wave(T_seq[0])
-    exp_colors = map_colors_line(E_exp, cividis)
-    per_colors = map_colors_line(E_per, cool)
-
-    fig = go.Figure()
-    fig.add_traces(make_filled_surface_lines_traces(X, Y, E_exp, exp_colors, 'Experience ψr²'))
-    fig.add_traces(make_filled_surface_lines_traces(X, Y, E_per, per_colors, 'Perception |∂ψr/∂t|'))
-
-    fig.update_layout(
-        scene=dict(
-            xaxis_title='X (spatial)',
-            yaxis_title='Y (spatial)',
-            zaxis_title='Amplitude / Energy'
-        ),
-        height=700,
-        margin=dict(l=0, r=0, b=0, t=30)
-    )
-    plot_placeholder.plotly_chart(fig, width='stretch')
+    # Static plot at initial frame
+    with profiler.stage('figure'):
+        fig = build_figure(skeleton(), frame_updates(fields.E_exp[0], fields.E_per[0], *colors[0]))
+    with profiler.stage('plotly_chart'):
+        plot_placeholder.plotly_chart(fig, width='stretch')
 
+# Only runs that computed their frames measure the cost per point; a cache
+# hit would teach the model that the full grid is nearly free
+if computed:
+    lod.record(n_lines, frame_times.size, time.perf_counter() - start)
+st.sidebar.caption(lod_label(stride, n_lines, grid_size))
+profiler.frame(frames=frame_times.size, lod=stride)
+show_profile(profiler, 1000 / frame_delay)
@@ -1,17 +1,21 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
-import time
+from rtc_engine import compute_fields
+from rtc_cache import param_key
+from rtc_service import cached
+from rtc_backends import DEFAULT_BACKEND
+from rtc_lines import session_wave_bank, compute_waveforms
+from rtc_delta import delta_chart
+from rtc_profile import sidebar_profiler, show_profile
+from rtc_animation import PlaybackClock
 
 st.title("Experience Resonance and Perception Wavefunctions Animation")
 
-# Animation state initialization
-if "frame_idx" not in st.session_state:
-    st.session_state.frame_idx = 0
-if "anim_running" not in st.session_state:
-    st.session_state.anim_running = False
-if "last_update" not in st.session_state:
-    st.session_state.last_update = 0
+# Animation state initialization: the frame shown comes from the wall clock
+if "clock_lines2" not in st.session_state:
+    st.session_state.clock_lines2 = PlaybackClock()
+clock = st.session_state.clock_lines2
 
 # Controls
 num_external_waves = st.sidebar.slider("Number of External Waves", 1, 10, 3)
@@ -19,14 +23,15 @@ A_i = st.sidebar.slider("Intrinsic amplitude A_i", 0.1, 2.0, 1.0)
 k_i = st.sidebar.slider("Intrinsic wave number k_i", 0.1, 5.0, 2.0)
 omega_i = st.sidebar.slider("Intrinsic angular frequency ω_i", 0.1, 5.0, 3.0)
 fps = st.sidebar.slider("Animation FPS", 1, 30, 10)
+delta = st.sidebar.checkbox("Delta updates (binary frames)", value=False)
+profiler = sidebar_profiler('lines2')
 
 if st.sidebar.button("Play"):
-    st.session_state.anim_running = True
+    clock.play(fps)
 if st.sidebar.button("Pause"):
-    st.session_state.anim_running = False
+    clock.pause()
 if st.sidebar.button("Reset"):
-    st.session_state.frame_idx = 0
-    st.session_state.anim_running = False
+    clock.reset()
 
 np.random.seed(42)
 A_e = np.linspace(0.5, 1.0, num_external_waves)
@@ -38,20 +43,15 @@ x = np.linspace(-np.pi, np.pi, 500)
 num_frames = 60
 T_seq = np.linspace(0, 2*np.pi, num_frames)
 
-def compute_waves(t):
-    psi_i = A_i * np.sin(k_i * x - omega_i * t)
-    psi_e_sum = np.zeros_like(x)
-    for i in range(num_external_waves):
-        psi_e_sum += A_e[i] * np.sin(k_e[i] * x - omega_e[i] * t + phi_e[i])
-    psi_r = psi_i + psi_e_sum + psi_i * psi_e_sum
-    E_exp = psi_r**2
-    dpsi_i_dt = -A_i * omega_i * np.cos(k_i * x - omega_i * t)
-    dpsi_e_sum_dt = np.zeros_like(x)
-    for i in range(num_external_waves):
-        dpsi_e_sum_dt += - A_e[i] * omega_e[i] * np.cos(k_e[i] * x - omega_e[i] * t + phi_e[i])
-    dpsi_r_dt = dpsi_i_dt + dpsi_e_sum_dt + dpsi_i_dt * psi_e_sum + dpsi_e_sum_dt * psi_i
-    E_per = np.abs(dpsi_r_dt)
-    return psi_i, [A_e[i]*np.sin(k_e[i]*x - omega_e[i]*t + phi_e[i]) for i in range(num_external_waves)], E_exp, E_per
+# Every frame of the animation in one pass, shared across sessions and reruns;
+# the individual external waves are evaluated only for the frame shown
+fields_args = (x, None, T_seq, A_i, k_i, 0.0, omega_i, A_e, k_e, 0.0, omega_e, phi_e)
+with profiler.stage('compute'):
+    fields = cached('fields', lambda: compute_fields(*fields_args, backend=DEFAULT_BACKEND), *fields_args)
+bank = session_wave_bank('lines2', x, A_e, k_e, omega_e, phi_e)
+
+def compute_waves(n):
+    return compute_waveforms(n, T_seq[n], fields, bank)
 
 def plot_experience(psi_i, external_waves, E_exp, t):
     fig = go.Figure()
@@ -68,20 +68,44 @@ def plot_perception(E_per, t):
     fig.update_layout(title=f"Perception Wavefunction at t={t:.2f}", yaxis_range=[0, np.max(E_per)*1.1])
     return fig
 
-col_exp, col_per = st.columns(2)
+# Only this region reruns on each tick while playing; the sidebar and the
+# arrays above are left alone until a widget changes
+@st.fragment(run_every=1.0 / fps if clock.playing else None)
+def chart_region():
+    frame_idx = clock.frame(fps, num_frames)
+    t = T_seq[frame_idx]
+    with profiler.stage('waveforms'):
+        psi_i, external_waves, E_exp, E_per = compute_waves(frame_idx)
+
+    col_exp, col_per = st.columns(2)
 
-current_time = time.time()
-frame_duration = 1.0 / fps
+    if delta:
+        # Figures go to the browser once; each tick sends only the y arrays, titles and ranges
+        with profiler.stage('figure'):
+            exp_updates = ([(0, 'y', psi_i)] + [(idx + 1, 'y', wave) for idx, wave in enumerate(external_waves)]
+                           + [(num_external_waves + 1, 'y', E_exp)])
+            exp_layout = {'title.text': f"Experience Waves at t={t:.2f}",
+                          'yaxis.range': [min(np.min(E_exp), np.min(psi_i))*1.2, np.max(E_exp)*1.2]}
+            per_layout = {'title.text': f"Perception Wavefunction at t={t:.2f}", 'yaxis.range': [0, np.max(E_per)*1.1]}
+        with profiler.stage('plotly_chart'):
+            with col_exp:
+                delta_chart(lambda: plot_experience(psi_i, external_waves, E_exp, t),
+                            param_key('lines2_exp', x, num_external_waves), [exp_updates],
+                            layout=exp_layout, height=450, key='lines2_exp')
+            with col_per:
+                delta_chart(lambda: plot_perception(E_per, t), param_key('lines2_per', x), [[(0, 'y', E_per)]],
+                            layout=per_layout, height=450, key='lines2_per')
+    else:
+        with profiler.stage('figure'):
+            fig_exp = plot_experience(psi_i, external_waves, E_exp, t)
+            fig_per = plot_perception(E_per, t)
 
-if st.session_state.anim_running and (current_time - st.session_state.last_update > frame_duration):
-    st.session_state.frame_idx = (st.session_state.frame_idx + 1) % num_frames
-    st.session_state.last_update = current_time
+        with profiler.stage('plotly_chart'):
+            col_exp.plotly_chart(fig_exp, width='stretch')
+            col_per.plotly_chart(fig_per, width='stretch')
 
-t = T_seq[st.session_state.frame_idx]
-psi_i, external_waves, E_exp, E_per = compute_waves(t)
+    profiler.frame(frame=frame_idx)
 
-fig_exp = plot_experience(psi_i, external_waves, E_exp, t)
-fig_per = plot_perception(E_per, t)
 
-col_exp.plotly_chart(fig_exp, use_container_width=True)
-col_per.plotly_chart(fig_per, use_container_width=True)
+chart_region()
+show_profile(profiler, fps)
@@ -1,88 +1,111 @@
 import streamlit as st
 import numpy as np
-import plotly.graph_objects as go
 import time
+from rtc_engine import compute_fields
+from rtc_cache import param_key
+from rtc_service import cached
+from rtc_backends import DEFAULT_BACKEND
+from rtc_lines import (GRID_SIZES, POINT_COST, external_bank, session_wave_bank, compute_waveforms, plot_experience,
+                       plot_perception, experience_frame, perception_frame)
+from rtc_delta import delta_chart
+from rtc_figure import figure_spec, build_figure
+from rtc_profile import sidebar_profiler, show_profile
+from rtc_lod import session_lod, lod_label
+from rtc_animation import PlaybackClock
 
 st.title("Animated Experience and Perception Wave Patterns")
 
 # Sidebar input sliders
-num_external_waves = st.sidebar.slider("Number of External Waves", 1, 10, 3)
+num_external_waves = st.sidebar.slider("Number of External Waves", 1, 1000, 3)
 A_i = st.sidebar.slider("Intrinsic Amplitude", 0.1, 2.0, 1.0)
 k_i = st.sidebar.slider("Intrinsic Wave Number", 0.1, 5.0, 2.0)
 omega_i = st.sidebar.slider("Intrinsic Angular Frequency", 0.1, 5.0, 3.0)
 fps = st.sidebar.slider("FPS (frames per second)", 1, 30, 10)
+grid_size = st.sidebar.select_slider("Samples per wave", GRID_SIZES, value=500)
+adaptive = st.sidebar.checkbox("Adaptive level of detail", value=True)
+delta = st.sidebar.checkbox("Delta updates (binary frames)", value=False)
+profiler = sidebar_profiler('lines3')
+
+# Playback position comes from the wall clock, see PlaybackClock
+if 'clock_lines3' not in st.session_state:
+    st.session_state['clock_lines3'] = PlaybackClock()
+clock = st.session_state['clock_lines3']
 
 # Play/Pause/Reset buttons
 col1, col2, col3 = st.sidebar.columns(3)
 if col1.button("Play"):
-    st.session_state['playing'] = True
+    clock.play(fps)
 if col2.button("Pause"):
-    st.session_state['playing'] = False
+    clock.pause()
 if col3.button("Reset"):
-    st.session_state['frame_index'] = 0
-    st.session_state['playing'] = False
-
-# Initialize session state variables
-if 'frame_index' not in st.session_state:
-    st.session_state['frame_index'] = 0
-if 'playing' not in st.session_state:
-    st.session_state['playing'] = False
-if 'last_time' not in st.session_state:
-    st.session_state['last_time'] = time.time()
-
-# Constants and arrays
-x = np.linspace(-np.pi, np.pi, 500)
+    clock.reset()
+
+# Constants and arrays; while playing, the samples are decimated to fit the frame budget
+lod = session_lod('lines3', POINT_COST, dims=1)
+lines_drawn = num_external_waves + 3
+stride, n_points = lod.level(grid_size, 1.0 / fps, clock.playing and adaptive, lines_drawn)
+x = np.linspace(-np.pi, np.pi, n_points)
 num_frames = 60
 T_seq = np.linspace(0, 2*np.pi, num_frames)
 
 np.random.seed(42)
-A_e_arr = np.linspace(0.5, 1.0, num_external_waves)
-k_e_arr = np.linspace(1.5, 3.0, num_external_waves)
-omega_e_arr = np.linspace(2.0, 4.0, num_external_waves)
-phi_e_arr = np.linspace(0, np.pi, num_external_waves)
-
-# Compute waveforms for a given time t
-def compute_waveforms(t):
-    psi_i = A_i * np.sin(k_i * x - omega_i * t)
-    psi_e_sum = np.zeros_like(x)
-    for i in range(num_external_waves):
-        psi_e_sum += A_e_arr[i] * np.sin(k_e_arr[i] * x - omega_e_arr[i] * t + phi_e_arr[i])
-    psi_r = psi_i + psi_e_sum + psi_i * psi_e_sum
-    E_exp = psi_r ** 2
-    dpsi_i_dt = -A_i * omega_i * np.cos(k_i * x - omega_i * t)
-    dpsi_e_sum_dt = np.zeros_like(x)
-    for i in range(num_external_waves):
-        dpsi_e_sum_dt += -A_e_arr[i] * omega_e_arr[i] * np.cos(k_e_arr[i] * x - omega_e_arr[i] * t + phi_e_arr[i])
-    dpsi_r_dt = dpsi_i_dt + dpsi_e_sum_dt + dpsi_i_dt * psi_e_sum + dpsi_e_sum_dt * psi_i
-    E_per = np.abs(dpsi_r_dt)
-    ext_waves = [A_e_arr[i]*np.sin(k_e_arr[i]*x - omega_e_arr[i]*t + phi_e_arr[i]) for i in range(num_external_waves)]
-    return psi_i, ext_waves, E_exp, E_per
-
-# Update frame index if playing and time elapsed exceeds interval
-current_time = time.time()
-interval = 1.0 / fps
-if st.session_state['playing'] and (current_time - st.session_state['last_time'] > interval):
-    st.session_state['frame_index'] = (st.session_state['frame_index'] + 1) % num_frames
-    st.session_state['last_time'] = current_time
-
-t = T_seq[st.session_state['frame_index']]
-psi_i, ext_waves, E_exp, E_per = compute_waveforms(t)
-
-# Layout columns for experience and perception plots
-col_exp, col_per = st.columns(2)
-
-with col_exp:
-    fig_exp = go.Figure()
-    fig_exp.add_trace(go.Scatter(x=x, y=psi_i, mode='lines', name='Intrinsic Wave', line=dict(color='cyan', dash='dash')))
-    for idx, wv in enumerate(ext_waves):
-        fig_exp.add_trace(go.Scatter(x=x, y=wv, mode='lines', name=f'External {idx+1}', line=dict(color='magenta', dash='dot'), opacity=0.5))
-    fig_exp.add_trace(go.Scatter(x=x, y=E_exp, mode='lines', name='Resonance Wave', line=dict(color='blue')))
-    fig_exp.update_layout(title=f'Experience Waves at t={t:.2f}', yaxis=dict(range=[min(np.min(E_exp), np.min(psi_i)) * 1.2, np.max(E_exp) * 1.2]))
-    st.plotly_chart(fig_exp, use_container_width=True)
-
-with col_per:
-    fig_per = go.Figure()
-    fig_per.add_trace(go.Scatter(x=x, y=E_per, mode='lines', name='Perception Wavefunction', line=dict(color='orange')))
-    fig_per.update_layout(title=f'Perception Wavefunction at t={t:.2f}', yaxis=dict(range=[0, np.max(E_per) * 1.1]))
-    st.plotly_chart(fig_per, use_container_width=True)
+A_e_arr, k_e_arr, omega_e_arr, phi_e_arr = external_bank(num_external_waves)
+
+# Every frame of the animation in one pass, shared across sessions and reruns;
+# the individual external waves are evaluated only for the frame shown
+fields_args = (x, None, T_seq, A_i, k_i, 0.0, omega_i, A_e_arr, k_e_arr, 0.0, omega_e_arr, phi_e_arr)
+with profiler.stage('compute'):
+    fields = cached('fields', lambda: compute_fields(*fields_args, backend=DEFAULT_BACKEND), *fields_args)
+bank = session_wave_bank('lines3', x, A_e_arr, k_e_arr, omega_e_arr, phi_e_arr)
+
+st.sidebar.caption(lod_label(stride, n_points, grid_size, dims=1))
+
+
+# Only this region reruns on each tick while playing; the sidebar and the
+# arrays above are left alone until a widget changes
+@st.fragment(run_every=1.0 / fps if clock.playing else None)
+def chart_region():
+    start = time.perf_counter()
+    frame_index = clock.frame(fps, num_frames)
+    t = T_seq[frame_index]
+    with profiler.stage('waveforms'):
+        psi_i, ext_waves, E_exp, E_per = compute_waveforms(frame_index, t, fields, bank)
+
+    # Layout columns for experience and perception plots
+    col_exp, col_per = st.columns(2)
+
+    if delta:
+        # Figures go to the browser once; each tick sends only the y arrays, title and range
+        with profiler.stage('figure'):
+            exp_updates, exp_layout = experience_frame(x, t, psi_i, ext_waves, E_exp)
+            per_updates, per_layout = perception_frame(t, E_per)
+        with profiler.stage('plotly_chart'):
+            with col_exp:
+                sent = delta_chart(lambda: plot_experience(x, t, psi_i, ext_waves, E_exp),
+                                   param_key('lines3_exp', x, num_external_waves), [exp_updates],
+                                   layout=exp_layout, height=450, key='lines3_exp')
+            with col_per:
+                delta_chart(lambda: plot_perception(x, t, E_per), param_key('lines3_per', x), [per_updates],
+                            layout=per_layout, height=450, key='lines3_per')
+        st.caption(f"Delta payload: {sent['frame_bytes'] / 1024:.1f} KiB/frame")
+    else:
+        # Skeletons are validated once per sample grid; each tick only fills in arrays, titles and ranges
+        with profiler.stage('figure'):
+            exp_spec = cached('figure_spec', lambda: figure_spec(plot_experience(x, t, psi_i, ext_waves, E_exp)),
+                              'lines3_exp', x, num_external_waves)
+            per_spec = cached('figure_spec', lambda: figure_spec(plot_perception(x, t, E_per)), 'lines3_per', x)
+            fig_exp = build_figure(exp_spec, *experience_frame(x, t, psi_i, ext_waves, E_exp))
+            fig_per = build_figure(per_spec, *perception_frame(t, E_per))
+
+        with profiler.stage('plotly_chart'):
+            with col_exp:
+                st.plotly_chart(fig_exp, width='stretch')
+            with col_per:
+                st.plotly_chart(fig_per, width='stretch')
+
+    lod.record(n_points, 1, time.perf_counter() - start, lines_drawn)
+    profiler.frame(frame=frame_index, lod=stride)
+
 
+chart_region()
+show_profile(profiler, fps)
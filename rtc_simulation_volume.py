@@ -0,0 +1,58 @@
+import streamlit as st
+import numpy as np
+from rtc_service import cached
+from rtc_volume import (VOLUME_FIELDS, VOLUME_GRIDS, OUT_GRIDS, REDUCTIONS, DEFAULT_VOLUME_BYTES, compute_volume,
+                        volume_figure)
+from rtc_profile import sidebar_profiler, show_profile
+
+st.title("Volumetric Holographic Resonance Field")
+
+# Parameters adjustable via sidebar; m is the wave vector along Z
+A_i = st.sidebar.slider("A_i (Amplitude intrinsic)", 0.1, 2.0, 1.0)
+A_e = st.sidebar.slider("A_e (Amplitude extrinsic)", 0.1, 2.0, 0.8)
+k_i = st.sidebar.slider("k_i (Wave vector intrinsic)", 0.1, 5.0, 2.0)
+k_e = st.sidebar.slider("k_e (Wave vector extrinsic)", 0.1, 5.0, 2.5)
+l_i = st.sidebar.slider("l_i (Wave vector intrinsic)", 0.1, 5.0, 1.5)
+l_e = st.sidebar.slider("l_e (Wave vector extrinsic)", 0.1, 5.0, 1.8)
+m_i = st.sidebar.slider("m_i (Z wave vector intrinsic)", 0.1, 5.0, 1.2)
+m_e = st.sidebar.slider("m_e (Z wave vector extrinsic)", 0.1, 5.0, 0.9)
+omega_i = st.sidebar.slider("ω_i (Angular frequency intrinsic)", 0.1, 5.0, 3.0)
+omega_e = st.sidebar.slider("ω_e (Angular frequency extrinsic)", 0.1, 5.0, 2.7)
+phi = st.sidebar.slider("Phase shift φ (radians)", 0.0, 2*np.pi, np.pi / 4)
+
+# Volume controls
+field = st.sidebar.selectbox("Field", VOLUME_FIELDS, index=VOLUME_FIELDS.index('E_exp'))
+kind = st.sidebar.radio("Render as", ('isosurface', 'volume'), horizontal=True)
+surfaces = st.sidebar.slider("Surfaces", 1, 6, 3)
+grid_size = st.sidebar.select_slider("Grid resolution", VOLUME_GRIDS, value=64)
+out_grid = st.sidebar.select_slider("Displayed resolution", OUT_GRIDS, value=24)
+reduction = st.sidebar.radio("Block reduction", REDUCTIONS, horizontal=True)
+animate = st.sidebar.checkbox("Animate Wave", value=False)
+num_frames = st.sidebar.slider("Frames", 2, 40, 12)
+frame_delay = st.sidebar.slider("Animation speed (ms per frame)", 50, 1000, 200)
+profiler = sidebar_profiler('volume')
+
+T_seq = np.linspace(0, 2 * np.pi, num_frames)
+frame_times = T_seq if animate else T_seq[:1]
+params = dict(A_i=A_i, k_i=k_i, l_i=l_i, m_i=m_i, omega_i=omega_i, A_e=A_e, k_e=k_e, l_e=l_e, m_e=m_e,
+              omega_e=omega_e, phi=phi)
+
+# Evaluated slab by slab within the memory budget, shared across sessions
+try:
+    with profiler.stage('compute'):
+        volume = cached('volume', lambda: compute_volume(params, grid_size, frame_times, out_grid, reduction=reduction),
+                        params, grid_size, frame_times, out_grid, reduction)
+except ValueError as exc:
+    st.error(str(exc))
+    st.stop()
+
+with profiler.stage('figure'):
+    fig = volume_figure(volume, field, frame_times, kind, surfaces, frame_delay if animate else None)
+with profiler.stage('plotly_chart'):
+    st.plotly_chart(fig, width='stretch')
+
+plan = volume.plan
+st.sidebar.caption(f"{grid_size}³ grid in slabs of {plan.slab} planes ({plan.slab_bytes / 2**20:.0f} MiB), "
+                   f"shown as {plan.out_grid}³; budget {DEFAULT_VOLUME_BYTES / 2**20:.0f} MiB")
+profiler.frame(frames=frame_times.size, grid=grid_size)
+show_profile(profiler, 1000 / frame_delay)
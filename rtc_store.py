@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import time
+import numpy as np
+from rtc_cache import param_key
+from rtc_engine import WAVE_PARAMS, compute_waves, resonance_terms
+
+# On-disk frame store for runs too large for RAM: each quantity is a
+# memory-mapped (T, Ny, Nx) .npy stack in a directory named after the
+# parameter hash, with a small JSON header and a per-frame "done" mask for
+# each field so a re-opened store only computes the frames it is missing,
+# whichever fields earlier runs stored.
+#
+#   python rtc_store.py render_configs/holographic_resonance.json --grid 2000 --frames 2000
+
+STORE_VERSION = 2
+STORE_FIELDS = ('E_exp', 'E_per', 'psi_r')
+KNOWN_FIELDS = ('psi_i', 'psi_e', 'psi_r', 'E_exp', 'E_per', 'dpsi_r_dt')
+
+# Working memory for one chunk of frames, counting the float64 temporaries
+DEFAULT_CHUNK_BYTES = 512 * 2**20
+TEMPORARIES_PER_POINT = 10
+
+
+def _plain(value):
+    # JSON-friendly copy of a parameter value
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class FrameStore:
+
+    def __init__(self, root, params, x, y, T_seq, fields=STORE_FIELDS, dtype=np.float32, stepping='direct'):
+        unknown = set(fields) - set(KNOWN_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown store fields: {', '.join(sorted(unknown))}")
+        self.params = {name: params[name] for name in WAVE_PARAMS}
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.T_seq = np.asarray(T_seq, dtype=float)
+        self.fields = tuple(fields)
+        self.dtype = np.dtype(dtype)
+        self.stepping = stepping
+        # Stepping changes the stored values (rotation rounding), so it keys the store too
+        self.key = param_key('frame_store', self.params, self.x, self.y, self.T_seq, self.dtype.str, stepping)
+        self.path = os.path.join(root, self.key)
+        self.shape = (self.T_seq.size, self.y.size, self.x.size)
+        self._open()
+
+    def _file(self, name):
+        return os.path.join(self.path, name + '.npy')
+
+    def _open(self):
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta['version'] != STORE_VERSION or tuple(meta['shape']) != self.shape:
+                raise ValueError(f"Frame store at {self.path} does not match these parameters")
+        else:
+            meta = dict(version=STORE_VERSION, key=self.key, shape=self.shape, dtype=self.dtype.str,
+                        stepping=self.stepping, fields=[], params={k: _plain(v) for k, v in self.params.items()},
+                        t_start=float(self.T_seq[0]), t_end=float(self.T_seq[-1]))
+            np.save(self._file('x'), self.x)
+            np.save(self._file('y'), self.y)
+            np.save(self._file('T_seq'), self.T_seq)
+
+        # Each field has its own done mask: a run storing other fields leaves
+        # it alone, and a field new to the store starts with no frames done
+        self.arrays = {}
+        self.done = {}
+        for name in self.fields:
+            mode = 'r+' if name in meta['fields'] else 'w+'
+            self.arrays[name] = np.lib.format.open_memmap(self._file(name), mode=mode,
+                                                          dtype=self.dtype, shape=self.shape)
+            self.done[name] = np.lib.format.open_memmap(self._file('done_' + name), mode=mode, dtype=bool,
+                                                        shape=self.shape[:1])
+            if mode == 'w+':
+                self.done[name][:] = False
+                self.done[name].flush()
+
+        meta['fields'] = sorted(set(meta['fields']) | set(self.fields))
+        with open(meta_path, 'w') as f:
+            json.dump(meta, f, indent=1)
+
+    @property
+    def complete(self):
+        return all(done.all() for done in self.done.values())
+
+    def missing(self, start=0, stop=None):
+        # Indices of frames in [start, stop) that some field of this store lacks
+        stop = self.shape[0] if stop is None else stop
+        done = np.logical_and.reduce([done[start:stop] for done in self.done.values()])
+        return start + np.flatnonzero(~done)
+
+    def chunk_frames(self, chunk_bytes=DEFAULT_CHUNK_BYTES):
+        # Frames per compute chunk so temporaries stay within chunk_bytes
+        frame_bytes = self.shape[1] * self.shape[2] * 8 * TEMPORARIES_PER_POINT
+        return max(1, int(chunk_bytes // frame_bytes))
+
+    def fill(self, start=0, stop=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+        # Compute every missing frame in [start, stop), writing straight into
+        # the memory maps a chunk at a time; returns how many were computed
+        missing = self.missing(start, stop)
+        if missing.size == 0:
+            return 0
+        X, Y = np.meshgrid(self.x, self.y)
+        params = [self.params[name] for name in WAVE_PARAMS]
+        chunk = self.chunk_frames(chunk_bytes)
+        # Consecutive runs of missing frames, split into chunks
+        runs = np.split(missing, np.flatnonzero(np.diff(missing) != 1) + 1)
+        for run in runs:
+            for lo in range(0, run.size, chunk):
+                a, b = run[lo], run[min(lo + chunk, run.size) - 1] + 1
+                self._write(a, b, compute_waves(X, Y, self.T_seq[a:b], *params, stepping=self.stepping))
+                for done in self.done.values():
+                    done[a:b] = True
+                    done.flush()
+        return missing.size
+
+    def _write(self, a, b, waves):
+        psi_i, dpsi_i_dt, psi_e, dpsi_e_dt = waves
+        psi_r, dpsi_r_dt = resonance_terms(psi_i, dpsi_i_dt, psi_e, dpsi_e_dt)
+        values = dict(psi_i=psi_i, psi_e=psi_e, psi_r=psi_r, dpsi_r_dt=dpsi_r_dt)
+        for name, out in self.arrays.items():
+            if name == 'E_exp':
+                np.square(psi_r, out=out[a:b])
+            elif name == 'E_per':
+                np.abs(dpsi_r_dt, out=out[a:b])
+            else:
+                out[a:b] = values[name]
+            out.flush()
+
+    def frame(self, name, n):
+        # One frame as a read-only view into the memory map, no copy
+        view = self.arrays[name][n]
+        view.flags.writeable = False
+        return view
+
+    def window(self, name, start, stop):
+        # Frames [start, stop) as a read-only memory-mapped view
+        view = self.arrays[name][start:stop]
+        view.flags.writeable = False
+        return view
+
+
+def open_store(root, config, fields=STORE_FIELDS, dtype=np.float32, extent=np.pi):
+    # FrameStore for a render-style config (wave parameters, grid, frames, t_end)
+    x = np.linspace(-extent, extent, config['grid'])
+    T_seq = np.linspace(0, config['t_end'], config['frames'])
+    return FrameStore(root, config, x, x, T_seq, fields=fields, dtype=dtype,
+                      stepping=config.get('stepping', 'direct'))
+
+
+def main(argv=None):
+    from rtc_render import load_config
+    parser = argparse.ArgumentParser(description="Precompute RTC frames into a memory-mapped frame store")
+    parser.add_argument('config', nargs='?', help="JSON or TOML config with the wave parameters")
+    parser.add_argument('--root', default='frame_store', help="store directory (default: frame_store)")
+    parser.add_argument('--grid', type=int, help="grid points per axis")
+    parser.add_argument('--frames', type=int, help="number of time steps")
+    parser.add_argument('--fields', default=','.join(STORE_FIELDS), help="comma-separated fields to store")
+    parser.add_argument('--dtype', default='float32', choices=('float32', 'float64'))
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config, grid=args.grid, frames=args.frames)
+    store = open_store(args.root, config, fields=args.fields.split(','), dtype=args.dtype)
+    start = time.perf_counter()
+    computed = store.fill()
+    print(f"{store.path}: computed {computed} of {store.shape[0]} frames "
+          f"({store.shape[1]}x{store.shape[2]}) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
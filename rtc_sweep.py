@@ -0,0 +1,185 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from rtc_cache import param_key
+from rtc_engine import WAVE_PARAMS, compute_waves, resonance_terms
+
+# Parameter sweeps over the (A, k, l, ω, φ) space: every combination of the
+# swept values is evaluated over a full period on a small grid and reduced
+# to summary metrics. Chunks of combinations run in a process pool and rows
+# stream to a CSV table; re-running the same sweep resumes where it stopped.
+#
+#   python rtc_sweep.py --param A_i=0.1:2:20 --param omega_i=0.1:5:20 -o sweep.csv
+
+METRICS = ('mean_E_exp', 'peak_E_exp', 'mean_E_per', 'peak_E_per', 'mean_psi_r', 'rms_psi_r')
+
+# Slider ranges of the apps, used by the heatmap view
+SWEEP_RANGES = dict(
+    A_i=(0.1, 2.0), A_e=(0.1, 2.0),
+    k_i=(0.1, 5.0), k_e=(0.1, 5.0),
+    l_i=(0.1, 5.0), l_e=(0.1, 5.0),
+    omega_i=(0.1, 5.0), omega_e=(0.1, 5.0),
+    phi=(0.0, 2 * np.pi),
+)
+
+# Grid points per axis and frames per period for each evaluation
+SWEEP_GRID = 30
+SWEEP_FRAMES = 40
+
+
+def parse_values(text):
+    # "start:stop:num" for evenly spaced values, else a comma-separated list
+    if ':' in text:
+        start, stop, num = text.split(':')
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(v) for v in text.split(',')])
+
+
+def sweep_points(spec, base):
+    # (N, len(WAVE_PARAMS)) array of every combination of the swept values,
+    # first swept parameter outermost; the rest come from `base`
+    unknown = set(spec) - set(WAVE_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {', '.join(sorted(unknown))}")
+    swept = np.stack(np.meshgrid(*spec.values(), indexing='ij'), axis=-1).reshape(-1, len(spec))
+    points = np.tile(np.array([base[name] for name in WAVE_PARAMS], dtype=float), (len(swept), 1))
+    for j, name in enumerate(spec):
+        points[:, WAVE_PARAMS.index(name)] = swept[:, j]
+    return points
+
+
+def point_metrics(params, X, Y, T_seq, stepping='direct'):
+    psi_r, dpsi_r_dt = resonance_terms(*compute_waves(X, Y, T_seq, *params, stepping=stepping))
+    E_exp = np.square(psi_r)
+    E_per = np.abs(dpsi_r_dt)
+    return (E_exp.mean(), E_exp.max(), E_per.mean(), E_per.max(), psi_r.mean(), np.sqrt(E_exp.mean()))
+
+
+def evaluate_chunk(indices, points, grid, frames, t_end, stepping='direct'):
+    # (indices, (n, len(METRICS)) metrics); runs in a worker process
+    x = np.linspace(-np.pi, np.pi, grid)
+    X, Y = np.meshgrid(x, x)
+    T_seq = np.linspace(0, t_end, frames)
+    return indices, np.array([point_metrics(p, X, Y, T_seq, stepping) for p in points])
+
+
+def _chunks(indices, points, chunk):
+    for lo in range(0, len(indices), chunk):
+        yield indices[lo:lo + chunk], points[indices[lo:lo + chunk]]
+
+
+def _evaluate(points, indices, grid, frames, t_end, workers, chunk, stepping):
+    # Yield (indices, metrics) per chunk as they finish, serially or in a pool
+    workers = workers or os.cpu_count() or 1
+    chunk = chunk or max(1, min(256, len(indices) // (8 * workers)))
+    if workers == 1:
+        for idx, pts in _chunks(indices, points, chunk):
+            yield evaluate_chunk(idx, pts, grid, frames, t_end, stepping)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(evaluate_chunk, idx, pts, grid, frames, t_end, stepping)
+                   for idx, pts in _chunks(indices, points, chunk)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def sweep(spec, base, grid=SWEEP_GRID, frames=SWEEP_FRAMES, t_end=2 * np.pi, workers=None, chunk=None,
+          stepping='direct'):
+    # In-memory sweep: (points, metrics) with one row per combination
+    points = sweep_points(spec, base)
+    metrics = np.empty((len(points), len(METRICS)))
+    for idx, values in _evaluate(points, np.arange(len(points)), grid, frames, t_end, workers, chunk, stepping):
+        metrics[idx] = values
+    return points, metrics
+
+
+def _completed_rows(path):
+    # Indices already in the table, dropping a row cut off by an interruption
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+    with open(path, newline='') as f:
+        return {int(row['index']) for row in csv.DictReader(f)}
+
+
+def run_sweep(spec, base, output, grid=SWEEP_GRID, frames=SWEEP_FRAMES, t_end=2 * np.pi, workers=None, chunk=None,
+              stepping='direct'):
+    # Stream the sweep to a CSV table, skipping rows a previous run wrote;
+    # returns (rows computed now, total rows)
+    points = sweep_points(spec, base)
+    key = param_key('sweep', {k: list(map(float, v)) for k, v in spec.items()},
+                    {k: base[k] for k in WAVE_PARAMS}, grid, frames, t_end, stepping)
+    meta_path = output + '.json'
+    if os.path.exists(output) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f)['key'] != key:
+                raise ValueError(f"{output} holds a different sweep; remove it or choose another output")
+        done = _completed_rows(output)
+    else:
+        with open(meta_path, 'w') as f:
+            json.dump(dict(key=key, swept=list(spec), rows=len(points), grid=grid, frames=frames, t_end=t_end,
+                           stepping=stepping), f, indent=1)
+        with open(output, 'w', newline='') as f:
+            csv.writer(f).writerow(('index',) + WAVE_PARAMS + METRICS)
+        done = set()
+
+    missing = np.array(sorted(set(range(len(points))) - done), dtype=np.intp)
+    with open(output, 'a', newline='') as f:
+        writer = csv.writer(f)
+        for idx, values in _evaluate(points, missing, grid, frames, t_end, workers, chunk, stepping):
+            writer.writerows([i, *points[i].tolist(), *row.tolist()] for i, row in zip(idx.tolist(), values))
+            f.flush()
+    return missing.size, len(points)
+
+
+def load_results(path):
+    # {column: array} of a sweep table, rows in sweep order
+    with open(path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    rows.sort(key=lambda row: int(row['index']))
+    return {name: np.array([float(row[name]) for row in rows]) for name in ('index',) + WAVE_PARAMS + METRICS}
+
+
+def heatmap_figure(spec, points, metrics, metric):
+    # Metric over two swept parameters (the first one on the y axis)
+    import plotly.graph_objects as go
+    (y_name, y_values), (x_name, x_values) = spec.items()
+    z = metrics[:, METRICS.index(metric)].reshape(len(y_values), len(x_values))
+    fig = go.Figure(go.Heatmap(x=x_values, y=y_values, z=z, colorscale='Viridis', colorbar=dict(title=metric)))
+    fig.update_layout(xaxis_title=x_name, yaxis_title=y_name, title=f"{metric} over {y_name} × {x_name}",
+                      height=500, margin=dict(l=0, r=0, b=0, t=40))
+    return fig
+
+
+def main(argv=None):
+    from rtc_render import load_config
+    parser = argparse.ArgumentParser(description="Sweep RTC wave parameters and tabulate summary metrics")
+    parser.add_argument('config', nargs='?', help="JSON or TOML config with the fixed wave parameters")
+    parser.add_argument('-p', '--param', action='append', required=True, metavar='NAME=VALUES',
+                        help="swept parameter, e.g. A_i=0.1:2:20 or phi=0,1.57,3.14 (repeatable)")
+    parser.add_argument('-o', '--output', default='sweep.csv', help="CSV table (default: sweep.csv)")
+    parser.add_argument('-j', '--workers', type=int, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk', type=int, help="combinations per task")
+    parser.add_argument('--grid', type=int, default=SWEEP_GRID, help="grid points per axis")
+    parser.add_argument('--frames', type=int, default=SWEEP_FRAMES, help="time steps over the period")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    spec = {}
+    for item in args.param:
+        name, _, values = item.partition('=')
+        spec[name] = parse_values(values)
+    start = time.perf_counter()
+    computed, total = run_sweep(spec, config, args.output, grid=args.grid, frames=args.frames,
+                                t_end=config['t_end'], workers=args.workers, chunk=args.chunk,
+                                stepping=config['stepping'])
+    print(f"{args.output}: computed {computed} of {total} combinations in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
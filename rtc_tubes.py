@@ -0,0 +1,163 @@
+import numpy as np
+import plotly.graph_objects as go
+from rtc_animation import animation_controls
+from rtc_colors import lut_indices, marker_colors, plotly_colorscale
+from rtc_figure import figure_spec, build_figure
+
+# Stages of the dual energy tubes view (rtc_simulation.py), importable
+# without starting Streamlit
+
+n_colors = 100
+
+# Grid resolutions offered in the sidebar, points per axis
+GRID_SIZES = (30, 50, 100, 150, 200, 300)
+# Prior seconds per grid point per frame to compute, build and send the
+# figure: the cost the app records on animated cache misses, 3.5-5.5e-6
+# on one core at 30-200 points per axis, rounded up
+POINT_COST = 5e-6
+
+LAYOUT = dict(
+    scene=dict(
+        xaxis_title='X (spatial)',
+        yaxis_title='Y (spatial)',
+        zaxis_title='Amplitude / Energy'
+    ),
+    height=700,
+    margin=dict(l=0, r=0, b=0, t=40)
+)
+
+
+def get_colors(Z, cmap, client=False):
+    return marker_colors(Z, cmap, n_colors, client=client)
+
+
+# (experience, perception) marker colours for every frame of the fields
+def frame_colors(fields, client=False):
+    return [(get_colors(E_exp.ravel(), 'viridis', client), get_colors(E_per.ravel(), 'plasma', client))
+            for E_exp, E_per in zip(fields.E_exp, fields.E_per)]
+
+
+def create_figure(X, Y, E_exp, E_per, exp_colors, per_colors):
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter3d(
+        x=X.ravel(), y=Y.ravel(), z=E_exp.ravel(),
+        mode='markers',
+        marker=dict(size=3, **exp_colors),
+        name='Experience ψr²'
+    ))
+
+    fig.add_trace(go.Scatter3d(
+        x=X.ravel(), y=Y.ravel(), z=E_per.ravel(),
+        mode='markers',
+        marker=dict(size=3, **per_colors),
+        name='Perception |∂ψr/∂t|'
+    ))
+
+    fig.update_layout(**LAYOUT)
+    return fig
+
+
+# (trace, attribute, value) updates taking a create_figure skeleton to a
+# frame: only Z and the marker colours change
+def frame_updates(E_exp, E_per, exp_colors, per_colors):
+    return ([(0, 'z', E_exp.ravel())] + [(0, f'marker.{name}', value) for name, value in exp_colors.items()]
+            + [(1, 'z', E_per.ravel())] + [(1, f'marker.{name}', value) for name, value in per_colors.items()])
+
+
+# All frames in one figure, played back in the browser. Frames are built
+# as dicts from the arrays on a skeleton validated once: `spec`, the
+# figure_spec of a create_figure for this grid, or one made here
+def animated_figure(X, Y, fields, colors, T_seq, frame_delay, spec=None):
+    if spec is None:
+        spec = figure_spec(create_figure(X, Y, fields.E_exp[0], fields.E_per[0], *colors[0]))
+    frames = [frame_updates(E_exp, E_per, *frame_color)
+              for E_exp, E_per, frame_color in zip(fields.E_exp, fields.E_per, colors)]
+    z_max = max(fields.E_exp.max(), fields.E_per.max())
+    layout = dict(animation_controls(frame_delay, [f'{t:.2f}' for t in T_seq]))
+    layout['scene.zaxis.range'] = [0, z_max * 1.05]
+    return build_figure(spec, frames[0], layout, frames=frames)
+
+
+# LUT index per point, mapped by the colorscale in the browser
+def lut_colors(Z, cmap):
+    return dict(color=lut_indices(Z.ravel(), n_colors).astype(np.uint8),
+                colorscale=plotly_colorscale(cmap, n_colors), cmin=0, cmax=n_colors - 1)
+
+
+# Figure for the delta chart: marker colours as LUT indices
+def delta_skeleton(X, Y, E_exp, E_per):
+    return create_figure(X, Y, E_exp, E_per, lut_colors(E_exp, 'viridis'), lut_colors(E_per, 'plasma'))
+
+
+# (trace, attribute, array) updates taking the delta skeleton to this frame
+def delta_frame(E_exp, E_per):
+    return [(0, 'z', E_exp.ravel()), (0, 'marker.color', lut_indices(E_exp.ravel(), n_colors).astype(np.uint8)),
+            (1, 'z', E_per.ravel()), (1, 'marker.color', lut_indices(E_per.ravel(), n_colors).astype(np.uint8))]
+
+
+# Render modes offered in the sidebar: per-point Scatter3d markers, or the
+# fields as Z matrices over 1D axes, colour-mapped by plotly.js through
+# the layout's colour axes
+RENDER_MODES = ('markers', 'surface', 'heatmap', 'contour')
+GRID_MODES = RENDER_MODES[1:]
+
+FIELD_NAMES = ('Experience ψr²', 'Perception |∂ψr/∂t|')
+COLOR_AXES = dict(
+    coloraxis=dict(colorscale=plotly_colorscale('viridis', n_colors), colorbar=dict(title='ψr²', x=1.0, len=0.9)),
+    coloraxis2=dict(colorscale=plotly_colorscale('plasma', n_colors), colorbar=dict(title='|∂ψr/∂t|', x=1.08, len=0.9)),
+)
+PLANE_LAYOUT = dict(
+    xaxis=dict(domain=[0, 0.44], title='X (spatial)'),
+    yaxis=dict(title='Y (spatial)'),
+    xaxis2=dict(domain=[0.5, 0.94], title='X (spatial)'),
+    yaxis2=dict(anchor='x2'),
+    annotations=[dict(text=name, x=x, y=1.0, xref='paper', yref='paper', xanchor='center', yanchor='bottom',
+                      showarrow=False) for name, x in zip(FIELD_NAMES, (0.22, 0.72))],
+    height=600,
+    margin=dict(l=0, r=0, b=0, t=40),
+)
+
+
+# Both fields over the 1D axes x, y in a grid mode: two surfaces in one
+# scene, or side-by-side heatmaps or contours
+def grid_figure(mode, x, y, E_exp, E_per):
+    fig = go.Figure()
+    if mode == 'surface':
+        for E, axis, name in zip((E_exp, E_per), ('coloraxis', 'coloraxis2'), FIELD_NAMES):
+            fig.add_trace(go.Surface(x=x, y=y, z=E.astype(np.float32), coloraxis=axis, name=name))
+        fig.update_layout(**LAYOUT)
+    else:
+        trace = go.Heatmap if mode == 'heatmap' else go.Contour
+        for E, axis, (xaxis, yaxis), name in zip((E_exp, E_per), ('coloraxis', 'coloraxis2'),
+                                                  (('x', 'y'), ('x2', 'y2')), FIELD_NAMES):
+            fig.add_trace(trace(x=x, y=y, z=E.astype(np.float32), coloraxis=axis, xaxis=xaxis, yaxis=yaxis, name=name))
+        fig.update_layout(**PLANE_LAYOUT)
+    fig.update_layout(**COLOR_AXES)
+    return fig
+
+
+# (trace, attribute, array) updates taking a grid_figure to a frame: Z only,
+# in single precision, which is plenty for the display and half the bytes
+def grid_updates(E_exp, E_per):
+    return [(0, 'z', E_exp.astype(np.float32)), (1, 'z', E_per.astype(np.float32))]
+
+
+# Layout fixing the colour ranges (and the surfaces' Z range) over the given
+# frames, so that colours mean the same value in every frame
+def grid_ranges(mode, E_exp, E_per):
+    layout = {'coloraxis.cmin': float(E_exp.min()), 'coloraxis.cmax': float(E_exp.max()),
+              'coloraxis2.cmin': float(E_per.min()), 'coloraxis2.cmax': float(E_per.max())}
+    if mode == 'surface':
+        layout['scene.zaxis.range'] = [0, max(E_exp.max(), E_per.max()) * 1.05]
+    return layout
+
+
+# Browser-played animation of a grid mode on `spec`, a grid_figure's figure_spec
+def grid_animated_figure(mode, x, y, fields, T_seq, frame_delay, spec=None):
+    if spec is None:
+        spec = figure_spec(grid_figure(mode, x, y, fields.E_exp[0], fields.E_per[0]))
+    frames = [grid_updates(E_exp, E_per) for E_exp, E_per in zip(fields.E_exp, fields.E_per)]
+    layout = dict(animation_controls(frame_delay, [f'{t:.2f}' for t in T_seq]))
+    layout.update(grid_ranges(mode, fields.E_exp, fields.E_per))
+    return build_figure(spec, frames[0], layout, frames=frames)
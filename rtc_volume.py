@@ -0,0 +1,298 @@
+import argparse
+import os
+import time
+import tracemalloc
+from collections import namedtuple
+import numpy as np
+from rtc_engine import bank_params
+
+# Volumetric resonance field on an (X, Y, Z) grid. psi_i and psi_e gain a
+# third wave vector component m, so a wave is A*sin(k*X + l*Y + m*Z - ω*t + φ).
+# A frame is evaluated one z-slab at a time into preallocated buffers sized
+# from a memory budget, and every slab is block-reduced straight into a
+# coarse volume for go.Volume/go.Isosurface: the full n³ field never exists.
+#
+#   python rtc_volume.py --grid 256 --frames 60 --out-grid 48 --budget 512
+
+VOLUME_PARAMS = ('A_i', 'k_i', 'l_i', 'm_i', 'omega_i', 'A_e', 'k_e', 'l_e', 'm_e', 'omega_e', 'phi')
+VOLUME_FIELDS = ('psi_r', 'E_exp', 'E_per')
+REDUCTIONS = ('mean', 'max')
+
+# Grid resolutions and coarse volume sizes offered by the volume page
+VOLUME_GRIDS = (32, 64, 96, 128, 192, 256)
+OUT_GRIDS = (16, 24, 32, 48)
+
+# Memory one volume computation may use, overridable from the environment
+DEFAULT_VOLUME_BYTES = int(os.environ.get('RTC_VOLUME_BYTES', 512 * 2**20))
+# float64 slab buffers per grid point: seven in VolumeWorkspace plus one of
+# headroom for the block reduction's intermediates
+SLAB_BUFFERS = 8
+# Coarse volumes are kept as float32
+OUT_DTYPE = np.float32
+
+# Coarse volumes and per-frame statistics of the full-resolution field.
+# volumes[name] is (T, Nz, Ny, Nx) at block centres x, y, z; stats[name] is
+# (T, 3) holding the min, max and mean over every grid point.
+Volume = namedtuple('Volume', ['x', 'y', 'z', 'volumes', 'stats', 'plan'])
+VolumePlan = namedtuple('VolumePlan', ['grid', 'factor', 'out_grid', 'slab', 'slab_bytes', 'out_bytes'])
+
+
+def block_factor(grid, out_grid):
+    # Grid points per coarse cell along each axis
+    return max(1, -(-grid // out_grid))
+
+
+def coarse_axis(axis, factor):
+    # Block centres of a coordinate axis
+    starts = np.arange(0, axis.size, factor)
+    return np.add.reduceat(axis, starts) / np.diff(np.append(starts, axis.size))
+
+
+def plan_volume(grid, out_grid, frames=1, fields=VOLUME_FIELDS, budget=DEFAULT_VOLUME_BYTES, keep=True):
+    # Slab thickness (z planes, a multiple of the block factor) that keeps the
+    # slab buffers, plus the kept coarse frames when `keep`, within budget
+    factor = block_factor(grid, out_grid)
+    out_grid = -(-grid // factor)
+    out_bytes = frames * out_grid ** 3 * len(fields) * np.dtype(OUT_DTYPE).itemsize if keep else 0
+    plane_bytes = grid * grid * 8 * SLAB_BUFFERS
+    blocks = (budget - out_bytes) // (plane_bytes * factor)
+    if blocks < 1:
+        need = out_bytes + plane_bytes * factor
+        raise ValueError(f"A {grid}³ volume reduced to {out_grid}³ over {frames} frames needs at least "
+                         f"{need / 2**20:.0f} MiB; the budget is {budget / 2**20:.0f} MiB")
+    slab = int(min(blocks * factor, grid))
+    return VolumePlan(grid, factor, out_grid, slab, slab * plane_bytes, out_bytes)
+
+
+class VolumeWorkspace:
+    # Slab buffers for evaluating one z-slab of the field per call, written
+    # with out= ufuncs so a frame allocates nothing but reduction results
+
+    def __init__(self, x, y, z, slab, A_i, k_i, l_i, m_i, omega_i, A_e, k_e, l_e, m_e, omega_e, phi=0.0):
+        self.x, self.y, self.z = (np.asarray(a, dtype=float) for a in (x, y, z))
+        self._intrinsic = self._bank(A_i, k_i, l_i, m_i, omega_i, 0.0)
+        self._extrinsic = self._bank(A_e, k_e, l_e, m_e, omega_e, phi)
+        shape = (slab, self.y.size, self.x.size)
+        self.phase, self.sines, self.psi_i, self.dpsi_i_dt, self.psi_e, self.dpsi_e_dt, self.psi_r = (
+            np.empty(shape) for _ in range(7))
+
+    def _bank(self, A, k, l, m, omega, phi):
+        # Per-wave axis phases k*x and l*y, so a slab only adds the outer sum
+        A, k, l, omega, phi = bank_params(A, k, l, omega, phi)
+        A, k, l, m, omega, phi = np.broadcast_arrays(A, k, l, np.atleast_1d(np.asarray(m, dtype=float)), omega, phi)
+        return [dict(A=a, dA=-a * w, omega=w, phi=p, m=mz, kx=kx * self.x, ly=(ly * self.y)[:, None])
+                for a, kx, ly, mz, w, p in zip(A, k, l, m, omega, phi)]
+
+    @property
+    def nbytes(self):
+        return 7 * self.psi_r.nbytes
+
+    def _phase(self, wave, z, t, out):
+        np.add(wave['ly'], wave['kx'], out=out)
+        out += (wave['m'] * z + (wave['phi'] - wave['omega'] * t))[:, None, None]
+
+    def _evaluate_bank(self, bank, z, t, psi, dpsi_dt):
+        n = z.size
+        phase, sines = self.phase[:n], self.sines[:n]
+        for j, wave in enumerate(bank):
+            self._phase(wave, z, t, phase)
+            target, dtarget = (psi, dpsi_dt) if j == 0 else (sines, phase)
+            np.sin(phase, out=target)
+            target *= wave['A']
+            np.cos(phase, out=dtarget)
+            dtarget *= wave['dA']
+            if j:
+                psi += sines
+                dpsi_dt += phase
+
+    def evaluate(self, z_start, z_stop, t):
+        # (psi_r, E_exp, E_per) for planes [z_start, z_stop) at time t, as
+        # views of the slab buffers overwritten by the next call
+        z = self.z[z_start:z_stop]
+        n = z.size
+        psi_i, dpsi_i_dt, psi_e, dpsi_e_dt = (self.psi_i[:n], self.dpsi_i_dt[:n], self.psi_e[:n],
+                                              self.dpsi_e_dt[:n])
+        self._evaluate_bank(self._intrinsic, z, t, psi_i, dpsi_i_dt)
+        self._evaluate_bank(self._extrinsic, z, t, psi_e, dpsi_e_dt)
+
+        psi_r = self.psi_r[:n]
+        np.multiply(psi_i, psi_e, out=psi_r)
+        psi_r += psi_i
+        psi_r += psi_e
+
+        # The phase and sine buffers are free again and take E_per and E_exp
+        E_per, scratch = self.phase[:n], self.sines[:n]
+        np.multiply(dpsi_i_dt, psi_e, out=E_per)
+        np.multiply(dpsi_e_dt, psi_i, out=scratch)
+        E_per += scratch
+        E_per += dpsi_i_dt
+        E_per += dpsi_e_dt
+        np.abs(E_per, out=E_per)
+        E_exp = np.square(psi_r, out=scratch)
+        return dict(psi_r=psi_r, E_exp=E_exp, E_per=E_per)
+
+
+def _reduce_blocks(values, factor, reduction, z_counts, counts, out):
+    # Block-reduce a (z, y, x) slab by `factor` per axis into `out`; the
+    # counts are the points per block, smaller in the last block of an axis
+    if factor == 1:
+        np.copyto(out, values, casting='same_kind')
+        return
+    ufunc = np.add if reduction == 'mean' else np.maximum
+    for axis in range(3):
+        values = ufunc.reduceat(values, np.arange(0, values.shape[axis], factor), axis=axis)
+    if reduction == 'mean':
+        values /= z_counts[:, None, None] * counts[:, None] * counts
+    np.copyto(out, values, casting='same_kind')
+
+
+def volume_frames(params, grid, T_seq, out_grid=48, fields=VOLUME_FIELDS, reduction='mean',
+                  budget=DEFAULT_VOLUME_BYTES, extent=np.pi):
+    # Yield (n, {field: coarse (Nz, Ny, Nx) volume}, {field: (min, max, mean)})
+    # per frame. The volumes are reused between frames, so copy what you keep;
+    # only the slab buffers count against the budget here.
+    if reduction not in REDUCTIONS:
+        raise ValueError(f"Unknown reduction {reduction!r}")
+    unknown = set(fields) - set(VOLUME_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown volume fields: {', '.join(sorted(unknown))}")
+    plan = plan_volume(grid, out_grid, fields=fields, budget=budget, keep=False)
+    axis = np.linspace(-extent, extent, grid)
+    ws = VolumeWorkspace(axis, axis, axis, plan.slab, *[params[name] for name in VOLUME_PARAMS])
+    factor, size = plan.factor, plan.out_grid
+    counts = np.diff(np.append(np.arange(0, grid, factor), grid)).astype(float)
+    coarse = {name: np.empty((size, size, size), OUT_DTYPE) for name in fields}
+    for n, t in enumerate(np.atleast_1d(np.asarray(T_seq, dtype=float))):
+        low = {name: np.inf for name in fields}
+        high = {name: -np.inf for name in fields}
+        total = dict.fromkeys(fields, 0.0)
+        for z_start in range(0, grid, plan.slab):
+            z_stop = min(z_start + plan.slab, grid)
+            values = ws.evaluate(z_start, z_stop, t)
+            cells = slice(z_start // factor, -(-z_stop // factor))
+            for name in fields:
+                slab = values[name]
+                low[name] = min(low[name], float(slab.min()))
+                high[name] = max(high[name], float(slab.max()))
+                total[name] += float(slab.sum())
+                _reduce_blocks(slab, factor, reduction, counts[cells], counts, coarse[name][cells])
+        stats = {name: (low[name], high[name], total[name] / grid ** 3) for name in fields}
+        yield n, coarse, stats
+
+
+def compute_volume(params, grid, T_seq, out_grid=48, fields=VOLUME_FIELDS, reduction='mean',
+                   budget=DEFAULT_VOLUME_BYTES, extent=np.pi):
+    # Every frame of T_seq as a Volume; the kept coarse frames and the slab
+    # buffers together stay within budget
+    T_seq = np.atleast_1d(np.asarray(T_seq, dtype=float))
+    plan = plan_volume(grid, out_grid, T_seq.size, fields, budget)
+    size = plan.out_grid
+    volumes = {name: np.empty((T_seq.size, size, size, size), OUT_DTYPE) for name in fields}
+    stats = {name: np.empty((T_seq.size, 3)) for name in fields}
+    # The slab buffers may use what the kept frames leave of the budget
+    frames = volume_frames(params, grid, T_seq, out_grid, fields, reduction, budget - plan.out_bytes, extent)
+    for n, coarse, frame_stats in frames:
+        for name in fields:
+            volumes[name][n] = coarse[name]
+            stats[name][n] = frame_stats[name]
+    axis = coarse_axis(np.linspace(-extent, extent, grid), plan.factor)
+    return Volume(axis, axis, axis, volumes, stats, plan)
+
+
+def iso_range(values, low=0.6, high=0.98):
+    # (isomin, isomax) as quantiles over every frame, so the surfaces of an
+    # animation are drawn at the same levels throughout
+    return tuple(float(q) for q in np.quantile(values, (low, high)))
+
+
+def volume_trace(volume, name, n=0, kind='isosurface', surfaces=3, isomin=None, isomax=None,
+                 colorscale='Viridis'):
+    # go.Isosurface or go.Volume of one coarse frame
+    import plotly.graph_objects as go
+    values = volume.volumes[name]
+    if isomin is None or isomax is None:
+        isomin, isomax = iso_range(values)
+    Z, Y, X = np.meshgrid(volume.z, volume.y, volume.x, indexing='ij')
+    common = dict(x=X.ravel(), y=Y.ravel(), z=Z.ravel(), value=values[n].ravel(), isomin=isomin, isomax=isomax,
+                  surface_count=surfaces, colorscale=colorscale, colorbar=dict(title=name),
+                  caps=dict(x_show=False, y_show=False, z_show=False))
+    if kind == 'volume':
+        return go.Volume(opacity=0.15, **common)
+    if kind == 'isosurface':
+        return go.Isosurface(opacity=0.6, **common)
+    raise ValueError(f"Unknown volume render kind {kind!r}")
+
+
+VOLUME_LAYOUT = dict(
+    scene=dict(xaxis_title='X (spatial)', yaxis_title='Y (spatial)', zaxis_title='Z (spatial)',
+               aspectmode='cube'),
+    height=700,
+    margin=dict(l=0, r=0, b=0, t=40)
+)
+
+
+def volume_figure(volume, name, T_seq, kind='isosurface', surfaces=3, frame_delay=None):
+    # One frame, or every frame with browser playback when frame_delay is set;
+    # frames are built as dicts that only carry the changing values
+    import plotly.graph_objects as go
+    from rtc_animation import animation_controls
+    from rtc_figure import figure_spec, build_figure
+    isomin, isomax = iso_range(volume.volumes[name])
+    fig = go.Figure(volume_trace(volume, name, 0, kind, surfaces, isomin, isomax))
+    fig.update_layout(**VOLUME_LAYOUT)
+    if frame_delay is None or len(T_seq) < 2:
+        return fig
+    frames = [[(0, 'value', values.ravel())] for values in volume.volumes[name]]
+    return build_figure(figure_spec(fig), layout=animation_controls(frame_delay, [f'{t:.2f}' for t in T_seq]),
+                        frames=frames)
+
+
+def main(argv=None):
+    from rtc_render import load_config
+    parser = argparse.ArgumentParser(description="Evaluate the RTC field on a 3D grid in memory-bounded z-slabs")
+    parser.add_argument('config', nargs='?', help="JSON or TOML config with the wave parameters")
+    parser.add_argument('--grid', type=int, default=256, help="grid points per axis")
+    parser.add_argument('--frames', type=int, help="number of time steps")
+    parser.add_argument('--out-grid', type=int, default=48, help="coarse volume points per axis")
+    parser.add_argument('--m-i', type=float, default=1.2, help="intrinsic z wave vector")
+    parser.add_argument('--m-e', type=float, default=0.9, help="extrinsic z wave vector")
+    parser.add_argument('--reduction', default='mean', choices=REDUCTIONS)
+    parser.add_argument('--budget', type=float, default=DEFAULT_VOLUME_BYTES / 2**20, help="memory budget in MiB")
+    parser.add_argument('-o', '--output', help="directory for the coarse volumes as .npy stacks")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config, frames=args.frames)
+    params = dict(config, m_i=args.m_i, m_e=args.m_e)
+    T_seq = np.linspace(0, config['t_end'], config['frames'])
+    budget = int(args.budget * 2**20)
+    plan = plan_volume(args.grid, args.out_grid, budget=budget, keep=False)
+    size = plan.out_grid
+
+    # Frames stream to memory-mapped stacks, so only the slabs are in RAM
+    stacks = {}
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        np.save(os.path.join(args.output, 'axis.npy'), coarse_axis(np.linspace(-np.pi, np.pi, args.grid), plan.factor))
+        np.save(os.path.join(args.output, 'T_seq.npy'), T_seq)
+        stacks = {name: np.lib.format.open_memmap(os.path.join(args.output, name + '.npy'), mode='w+',
+                                                  dtype=OUT_DTYPE, shape=(T_seq.size, size, size, size))
+                  for name in VOLUME_FIELDS}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for n, coarse, stats in volume_frames(params, args.grid, T_seq, args.out_grid, reduction=args.reduction,
+                                          budget=budget):
+        for name, stack in stacks.items():
+            stack[n] = coarse[name]
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    for stack in stacks.values():
+        stack.flush()
+    print(f"{args.grid}³ × {T_seq.size} frames in {elapsed:.1f}s ({elapsed / T_seq.size:.2f}s/frame), "
+          f"slabs of {plan.slab} planes, coarse {size}³; "
+          f"peak {peak / 2**20:.0f} MiB of a {budget / 2**20:.0f} MiB budget")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+import streamlit as st
+
+# Single entry point for the RTC views. Each page is its own script and is
+# only executed (and its imports loaded) when it is opened.
+#
+#   streamlit run streamlit_app.py
+
+st.set_page_config(page_title="Resonant Consciousness Theory")
+
+pages = {
+    "3D fields": [
+        st.Page('rtc_simulation.py', title="Dual energy tubes", icon="🌀", default=True),
+        st.Page('rtc_simulation_area.py', title="Filled area", icon="🏔️"),
+        st.Page('rtc_simulation_volume.py', title="Volume", icon="🧊"),
+    ],
+    "Wave lines": [
+        st.Page('rtc_simulation_lines.py', title="Single waves", icon="〰️"),
+        st.Page('rtc_simulation_lines2.py', title="Wave bank", icon="🎚️"),
+        st.Page('rtc_simulation_lines3.py', title="Multi-wave", icon="🌊"),
+    ],
+}
+
+st.navigation(pages).run()
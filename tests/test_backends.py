@@ -0,0 +1,40 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from rtc_backends import CHECK_CASES, TOLERANCE, NumpyBackend, available_backends, get_backend
+from rtc_engine import Fields
+
+# Every installed compute backend against the NumPy reference, on each of
+# the cases `python rtc_backends.py` checks: a grid small enough to run in
+# the suite, with an odd frame count so no backend lines up by luck
+
+GRID = 40
+FRAMES = 7
+
+
+@pytest.fixture(scope='module')
+def inputs():
+    x = np.linspace(-np.pi, np.pi, GRID)
+    T_seq = np.linspace(0, 2 * np.pi, FRAMES)
+    return {case: (make(x), T_seq) for case, make in CHECK_CASES.items()}
+
+
+@pytest.mark.parametrize('case', sorted(CHECK_CASES))
+@pytest.mark.parametrize('backend', available_backends())
+def test_backend_matches_numpy(inputs, backend, case):
+    ((X, Y), params), T_seq = inputs[case]
+    reference = NumpyBackend().fields(X, Y, T_seq, *params)
+    result = get_backend(backend).fields(X, Y, T_seq, *params)
+    assert isinstance(result, Fields)
+    for field, got, ref in zip(Fields._fields, result, reference):
+        assert got.shape == ref.shape == (FRAMES,) + np.shape(X), field
+        # Same measure as check_backends: relative to the field's largest magnitude
+        scale = max(np.abs(ref).max(), 1.0)
+        np.testing.assert_allclose(got, ref, rtol=0, atol=TOLERANCE * scale, err_msg=f"{backend}/{case}: {field}")
+
+
+def test_auto_picks_first_installed():
+    assert type(get_backend('auto')) is type(get_backend(available_backends()[0]))
@@ -0,0 +1,52 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from rtc_cache import DEFAULT_MAX_BYTES, FrameCache
+from rtc_engine import WAVE_PARAMS, compute_fields
+from rtc_graph import GRAPH_CACHE_BYTES, field_graph
+from rtc_service import ComputeService
+
+# A one-parameter change at the tubes app's default grid recomputes only its
+# own branch, with the default budgets: every earlier change stays cached too,
+# so nodes of the other branch are never evicted along the way
+
+GRID = 300
+FRAMES = 40
+
+BRANCHES = {
+    'A_i': ['psi_i', 'fields'],
+    'k_i': ['intrinsic_phase', 'psi_i', 'fields'],
+    'omega_i': ['intrinsic_phase', 'psi_i', 'fields'],
+    'A_e': ['psi_e', 'fields'],
+    'phi': ['extrinsic_phase', 'psi_e', 'fields'],
+    'omega_e': ['extrinsic_phase', 'psi_e', 'fields'],
+}
+
+
+@pytest.fixture(scope='module')
+def graph():
+    x = np.linspace(-np.pi, np.pi, GRID)
+    X, Y = np.meshgrid(x, x)
+    T_seq = np.linspace(0, 2 * np.pi, FRAMES)
+    params = dict(zip(WAVE_PARAMS, (1.0, 2.0, 1.5, 3.0, 0.8, 2.5, 1.8, 2.7, np.pi / 4)))
+    graph = field_graph(service=ComputeService(FrameCache(GRAPH_CACHE_BYTES)),
+                        shared=ComputeService(FrameCache(DEFAULT_MAX_BYTES)))
+    graph.set_inputs(X=X, Y=Y, T_seq=T_seq, **params)
+    graph.evaluate('fields')
+    return graph, params
+
+
+@pytest.mark.parametrize('name', list(BRANCHES))
+def test_change_recomputes_only_its_branch(graph, name):
+    graph, params = graph
+    params[name] += 0.1
+    inputs = dict(graph._inputs, **params)
+    graph.set_inputs(**inputs)
+    result = graph.evaluate('fields')
+    assert graph.recomputed == BRANCHES[name]
+    expected = compute_fields(inputs['X'], inputs['Y'], inputs['T_seq'], *(params[p] for p in WAVE_PARAMS))
+    for field, got, ref in zip(expected._fields, result, expected):
+        np.testing.assert_allclose(got, ref, rtol=1e-12, atol=1e-12, err_msg=field)